@@ -0,0 +1,138 @@
+import argparse
+import asyncio
+import sys
+import time
+
+from app import dependencies, schema_upgrade
+from app.crud import users_crud
+from app.services import tasks_import_service
+from app.utils import profiling
+
+
+async def import_tasks(path: str, email: str, import_format: str, batch_size: int):
+    """
+    Imports tasks from a CSV or NDJSON file for the user with the given email,
+    printing the progress after every batch.
+
+    Parameters:
+    - path (str): The path of the file to import.
+    - email (str): The email of the user the tasks are imported for.
+    - import_format (str): "csv" or "ndjson".
+    - batch_size (int): The number of tasks inserted per transaction.
+
+    Returns:
+    - int: The exit code of the command.
+    """
+
+    def report(result):
+        print(f"imported {result.imported} tasks, rejected {result.failed} rows")
+
+    dependencies.init_engine()
+    try:
+        async with dependencies.SessionLocal() as db:
+            user = await users_crud.get_user_by_email(db=db, email=email)
+            if user is None:
+                print(f"No user has the email {email}", file=sys.stderr)
+                return 1
+            with open(path, encoding="utf-8-sig", newline="") as stream:
+                result = await tasks_import_service.import_tasks(
+                    db=db,
+                    rows=tasks_import_service.iter_import_rows(stream, import_format),
+                    user_id=user.id,
+                    batch_size=batch_size,
+                    on_progress=report,
+                )
+    finally:
+        await dependencies.dispose_engine()
+    for error in result.errors:
+        print(f"line {error.line}: {error.error}", file=sys.stderr)
+    if result.errors_truncated:
+        print("more rows were rejected than listed", file=sys.stderr)
+    report(result)
+    return 0
+
+
+async def upgrade_db():
+    """
+    Upgrades the schema of the database at DATABASE_URL to the current models.
+
+    Returns:
+    - int: The exit code of the command.
+    """
+    engine = dependencies.init_engine()
+    try:
+        await schema_upgrade.upgrade_schema(engine)
+    finally:
+        await dependencies.dispose_engine()
+    print("The database schema is up to date")
+    return 0
+
+
+def profile_header(ttl: int):
+    """
+    Prints an X-Profile header value requesting a profile of a request.
+
+    Parameters:
+    - ttl (int): The number of seconds the header is accepted for.
+
+    Returns:
+    - int: The exit code of the command.
+    """
+    if not profiling.PROFILING_SECRET:
+        print("PROFILING_SECRET isn't set", file=sys.stderr)
+        return 1
+    expires_at = int(time.time()) + ttl
+    print(profiling.sign_profile_request(profiling.PROFILING_SECRET, expires_at))
+    return 0
+
+
+def main(argv=None):
+    """
+    Entry point of the command line interface.
+
+    Usage:
+        python -m app.cli import-tasks tasks.csv --email user@example.com
+        python -m app.cli profile-header --ttl 300
+        python -m app.cli upgrade-db
+    """
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser(
+        "import-tasks", help="Import tasks from a CSV or NDJSON file."
+    )
+    import_parser.add_argument("path")
+    import_parser.add_argument("--email", required=True)
+    import_parser.add_argument(
+        "--format", choices=tasks_import_service.IMPORT_FORMATS, dest="import_format"
+    )
+    import_parser.add_argument(
+        "--batch-size", type=int, default=tasks_import_service.IMPORT_BATCH_SIZE
+    )
+    profile_parser = commands.add_parser(
+        "profile-header", help="Print a signed X-Profile header value."
+    )
+    profile_parser.add_argument("--ttl", type=int, default=300, metavar="SECONDS")
+    commands.add_parser(
+        "upgrade-db", help="Add the tables and columns missing from the database."
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "upgrade-db":
+        return asyncio.run(upgrade_db())
+
+    if args.command == "profile-header":
+        if not 0 < args.ttl <= profiling.MAX_SIGNATURE_TTL:
+            parser.error(
+                f"--ttl must be between 1 and {profiling.MAX_SIGNATURE_TTL} seconds"
+            )
+        return profile_header(args.ttl)
+    import_format = args.import_format or args.path.rsplit(".", 1)[-1].lower()
+    if import_format not in tasks_import_service.IMPORT_FORMATS:
+        parser.error("--format is required when the file extension isn't csv or ndjson")
+    return asyncio.run(
+        import_tasks(args.path, args.email, import_format, args.batch_size)
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,89 @@
 import datetime
-from sqlalchemy.orm import Session
-from ..models import task_model
+from typing import AsyncIterator, List, Optional, Sequence, Set, Tuple
+from uuid import UUID, uuid4
+from sqlalchemy import (
+    bindparam,
+    delete,
+    func,
+    insert,
+    literal_column,
+    select,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import task_model, user_model
 from ..schemas import task_schema
 
+# Columns read for task listings, matching the fields of task_schema.Task
+TASK_COLUMNS = (
+    task_model.Task.id,
+    task_model.Task.title,
+    task_model.Task.description,
+    task_model.Task.due_date,
+    task_model.Task.created_date,
+    task_model.Task.user_id,
+)
 
-def create_task(db: Session, task: task_schema.TaskBase, user_id: str):
+
+async def _bump_task_version(db: AsyncSession, user_id: str):
+    """
+    Increments the version of a user's task set, within the caller's transaction.
+
+    Every function of this module that writes tasks calls it before committing,
+    so the version changes exactly when the user's tasks do.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - user_id (str): The ID of the user whose tasks changed.
+    """
+    await db.execute(
+        update(user_model.User)
+        .where(user_model.User.id == user_id)
+        .values(task_version=user_model.User.task_version + 1)
+    )
+
+
+async def _bump_task_versions(db: AsyncSession, user_ids: Set[UUID]):
+    """
+    Increments the version of several users' task sets with a single UPDATE,
+    within the caller's transaction.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - user_ids (Set[UUID]): The IDs of the users whose tasks changed.
+    """
+    await db.execute(
+        update(user_model.User)
+        .where(user_model.User.id.in_(user_ids))
+        .values(task_version=user_model.User.task_version + 1)
+    )
+
+
+async def get_task_version(db: AsyncSession, user_id: str):
+    """
+    Retrieves the version of a user's task set.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - user_id (str): The ID of the user.
+
+    Returns:
+    - int: The version of the user's tasks, or 0 if the user doesn't exist.
+    """
+    version = await db.scalar(
+        select(user_model.User.task_version).where(user_model.User.id == user_id)
+    )
+    return version or 0
+
+
+async def create_task(db: AsyncSession, task: task_schema.TaskBase, user_id: str):
     """
     Creates a new task in the database.
 
     Parameters:
-    - db (Session): The database session.
+    - db (AsyncSession): The database session.
     - task (task_schema.Task): The task data for creating a new task.
 
     Returns:
@@ -23,72 +97,455 @@ def create_task(db: Session, task: task_schema.TaskBase, user_id: str):
         due_date=task.due_date,
     )
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    await _bump_task_version(db=db, user_id=user_id)
+    await db.commit()
+    await db.refresh(db_task)
     return db_task
 
 
-def get_tasks_by_user(db: Session, user_id: str):
+async def create_tasks(
+    db: AsyncSession, tasks: List[task_schema.TaskBase], user_id: str
+):
+    """
+    Creates several tasks in one transaction, with a single multi-row
+    INSERT ... RETURNING statement.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - tasks (List[task_schema.TaskBase]): The data of the tasks to create.
+    - user_id (str): The ID of the user creating the tasks.
+
+    Returns:
+    - List[task_model.Task]: The created tasks, in the order they were given.
+    """
+    created_date = datetime.datetime.now()
+    result = await db.scalars(
+        insert(task_model.Task).returning(
+            task_model.Task, sort_by_parameter_order=True
+        ),
+        [
+            {
+                "title": task.title,
+                "description": task.description,
+                "created_date": created_date,
+                "user_id": user_id,
+                "due_date": task.due_date,
+            }
+            for task in tasks
+        ],
+    )
+    db_tasks = result.all()
+    await _bump_task_version(db=db, user_id=user_id)
+    await db.commit()
+    return db_tasks
+
+
+async def apply_task_writes(
+    db: AsyncSession,
+    creates: Sequence[Tuple[task_schema.TaskBase, UUID]],
+    deletes: Sequence[Tuple[UUID, UUID]],
+):
     """
-    Retrieves all tasks created by a specific user.
+    Creates and deletes tasks of any number of users in one transaction: one
+    multi-row INSERT ... RETURNING for the creates, one DELETE ... RETURNING
+    for the deletes and one UPDATE of the owners' task versions.
 
     Parameters:
-    - db (Session): The database session.
+    - db (AsyncSession): The database session.
+    - creates (Sequence[Tuple[task_schema.TaskBase, UUID]]): The data of the tasks
+      to create, each with the ID of the user creating it.
+    - deletes (Sequence[Tuple[UUID, UUID]]): The IDs of the tasks to delete, each
+      with the ID of the user the task must belong to.
+
+    Returns:
+    - Tuple[List[task_model.Task], Set[UUID]]: The created tasks, in the order
+      they were given, and the IDs of the deleted tasks. Tasks that don't exist
+      or belong to another user aren't deleted.
+    """
+    db_tasks = []
+    deleted_ids = set()
+    changed_users = set()
+    if creates:
+        created_date = datetime.datetime.now()
+        result = await db.scalars(
+            insert(task_model.Task).returning(
+                task_model.Task, sort_by_parameter_order=True
+            ),
+            [
+                {
+                    "title": task.title,
+                    "description": task.description,
+                    "created_date": created_date,
+                    "user_id": user_id,
+                    "due_date": task.due_date,
+                }
+                for task, user_id in creates
+            ],
+        )
+        db_tasks = result.all()
+        changed_users.update(user_id for _, user_id in creates)
+    if deletes:
+        result = await db.execute(
+            delete(task_model.Task)
+            .where(
+                tuple_(task_model.Task.id, task_model.Task.user_id).in_(list(deletes))
+            )
+            .returning(task_model.Task.id, task_model.Task.user_id)
+        )
+        for task_id, user_id in result:
+            deleted_ids.add(task_id)
+            changed_users.add(user_id)
+    if changed_users:
+        await _bump_task_versions(db=db, user_ids=changed_users)
+    await db.commit()
+    return db_tasks, deleted_ids
+
+
+async def import_tasks(
+    db: AsyncSession, tasks: List[task_schema.TaskBase], user_id: str
+):
+    """
+    Inserts a batch of imported tasks and commits it.
+
+    On PostgreSQL the rows are loaded with COPY, the fastest way into a table;
+    other databases get a multi-row INSERT. Nothing is read back.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - tasks (List[task_schema.TaskBase]): The data of the tasks to insert.
+    - user_id (str): The ID of the user the tasks are imported for.
+
+    Returns:
+    - int: The number of tasks inserted.
+    """
+    created_date = datetime.datetime.now()
+    rows = [
+        (uuid4(), task.title, task.description, created_date, user_id, task.due_date)
+        for task in tasks
+    ]
+    columns = ["id", "title", "description", "created_date", "user_id", "due_date"]
+    connection = await db.connection()
+    if connection.dialect.name == "postgresql":
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            task_model.Task.__tablename__, records=rows, columns=columns
+        )
+    else:
+        await db.execute(
+            insert(task_model.Task), [dict(zip(columns, row)) for row in rows]
+        )
+    await _bump_task_version(db=db, user_id=user_id)
+    await db.commit()
+    return len(rows)
+
+
+def _search_condition(db: AsyncSession, terms: str):
+    """
+    Builds the full-text search condition matching tasks against the given words.
+
+    PostgreSQL matches the GIN-indexed document of `task_model.search_document`
+    with `websearch_to_tsquery`, SQLite matches the `tasks_fts` FTS5 table.
+
+    Parameters:
+    - db (AsyncSession): The database session, whose dialect picks the search method.
+    - terms (str): The words to look for.
+
+    Returns:
+    - ColumnElement: The search condition.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return task_model.search_document().op("@@")(
+            func.websearch_to_tsquery(literal_column("'english'::regconfig"), terms)
+        )
+    # Every word is quoted so FTS5 operators in the input are matched literally
+    query = " ".join('"' + word.replace('"', '""') + '"' for word in terms.split())
+    return text(
+        "tasks.rowid IN (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH :terms)"
+    ).bindparams(terms=query)
+
+
+def _filter_conditions(db: AsyncSession, filters: task_schema.TaskFilters):
+    """
+    Translates task listing filters into query conditions.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - filters (task_schema.TaskFilters): The filters of the listing.
+
+    Returns:
+    - List[ColumnElement]: The conditions the tasks must meet.
+    """
+    task = task_model.Task
+    conditions = []
+    if filters.due_from is not None:
+        conditions.append(task.due_date >= filters.due_from)
+    if filters.due_to is not None:
+        conditions.append(task.due_date <= filters.due_to)
+    if filters.overdue:
+        conditions.append(task.due_date < datetime.date.today())
+    if filters.created_from is not None:
+        conditions.append(task.created_date >= filters.created_from)
+    if filters.created_to is not None:
+        conditions.append(task.created_date <= filters.created_to)
+    if filters.q and filters.q.strip():
+        conditions.append(_search_condition(db, filters.q))
+    return conditions
+
+
+async def get_tasks_by_user(
+    db: AsyncSession,
+    user_id: str,
+    limit: Optional[int] = None,
+    sort: str = "due_date",
+    after: Optional[Tuple] = None,
+    filters: Optional[task_schema.TaskFilters] = None,
+):
+    """
+    Retrieves the tasks created by a specific user, ordered by the given date
+    column and then by ID.
+
+    Only the columns in TASK_COLUMNS are read, as plain rows rather than ORM
+    entities, which keeps them out of the identity map.
+
+    Pages are read with keyset pagination: instead of an offset, `after` holds
+    the sort key of the last task of the previous page, so every page is a range
+    scan of the (user_id, <sort>, id) index no matter how deep it is. Date
+    filters narrow that same range, and text searches go through the full-text
+    index of the database.
+
+    Parameters:
+    - db (AsyncSession): The database session.
     - user_id (str): The ID of the user whose tasks are to be retrieved.
+    - limit (Optional[int]): The maximum number of tasks to return. Defaults to all of them.
+    - sort (str): The column to order by, either "due_date" or "created_date".
+    - after (Optional[Tuple]): The (sort value, task ID) key the page starts after.
+    - filters (Optional[task_schema.TaskFilters]): The filters the tasks must match.
 
     Returns:
-    - List[task_model.Task]: A list of tasks created by the user.
+    - List[Row]: A list of the tasks created by the user, as rows of TASK_COLUMNS.
     """
-    return db.query(task_model.Task).filter(task_model.Task.user_id == user_id).all()
+    sort_column = getattr(task_model.Task, sort)
+    query = select(*TASK_COLUMNS).where(task_model.Task.user_id == user_id)
+    if filters is not None:
+        query = query.where(*_filter_conditions(db, filters))
+    if after is not None:
+        query = query.where(tuple_(sort_column, task_model.Task.id) > tuple_(*after))
+    query = query.order_by(sort_column, task_model.Task.id).limit(limit)
+    result = await db.execute(query)
+    return result.all()
 
 
-def get_task_by_id(db: Session, task_id: str):
+async def get_task_stats(db: AsyncSession, user_id: str, today: datetime.date):
+    """
+    Counts a user's tasks, overall and by due date, in a single aggregate query
+    over the user's range of the (user_id, due_date, id) index.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - user_id (str): The ID of the user whose tasks are counted.
+    - today (datetime.date): The day overdue and upcoming tasks are counted from.
+
+    Returns:
+    - Row: The `total`, `overdue`, `due_today` and `due_this_week` counts.
+    """
+    due_date = task_model.Task.due_date
+    end_of_week = today + datetime.timedelta(days=6 - today.weekday())
+    query = select(
+        func.count().label("total"),
+        func.count().filter(due_date < today).label("overdue"),
+        func.count().filter(due_date == today).label("due_today"),
+        func.count()
+        .filter(due_date.between(today, end_of_week))
+        .label("due_this_week"),
+    ).where(task_model.Task.user_id == user_id)
+    result = await db.execute(query)
+    return result.one()
+
+
+async def stream_tasks(
+    db: AsyncSession, user_id: Optional[str] = None, batch_size: int = 1000
+) -> AsyncIterator[Sequence]:
+    """
+    Streams tasks in batches through a server-side cursor, so memory use only
+    depends on the batch size and not on the number of tasks.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - user_id (Optional[str]): The ID of the user whose tasks are streamed, or
+      None to stream the tasks of every user.
+    - batch_size (int): The number of rows fetched from the cursor at a time.
+
+    Yields:
+    - Sequence[Row]: Batches of tasks, as rows of TASK_COLUMNS in no particular order.
+    """
+    query = select(*TASK_COLUMNS)
+    if user_id is not None:
+        query = query.where(task_model.Task.user_id == user_id)
+    result = await db.stream(query.execution_options(yield_per=batch_size))
+    async for partition in result.partitions():
+        yield partition
+
+
+async def get_task_by_id(db: AsyncSession, task_id: str):
     """
     Retrieves a task by its ID.
 
     Parameters:
-    - db (Session): The database session.
+    - db (AsyncSession): The database session.
     - task_id (str): The ID of the task to be retrieved.
 
     Returns:
     - task_model.Task: The task with the specified ID, or None if not found.
     """
-    return db.query(task_model.Task).filter(task_model.Task.id == task_id).first()
+    result = await db.execute(
+        select(task_model.Task).where(task_model.Task.id == task_id)
+    )
+    return result.scalars().first()
 
 
-def delete_task_by_id(db: Session, task_id: str):
+async def delete_task_by_id(db: AsyncSession, task_id: UUID, user_id: UUID):
     """
-    Deletes a task from the database by its ID.
+    Deletes a task of a user with a single DELETE ... RETURNING statement.
 
     Parameters:
-    - db (Session): The database session.
-    - task_id (str): The ID of the task to be deleted.
+    - db (AsyncSession): The database session.
+    - task_id (UUID): The ID of the task to be deleted.
+    - user_id (UUID): The ID of the user the task must belong to.
 
     Returns:
-    - int: The number of rows affected (should be 1 if the task was deleted).
+    - bool: True if the task was deleted, False if it doesn't exist or belongs
+      to another user.
     """
-    deleted_task = (
-        db.query(task_model.Task).filter(task_model.Task.id == task_id).delete()
+    result = await db.scalars(
+        delete(task_model.Task)
+        .where(task_model.Task.id == task_id, task_model.Task.user_id == user_id)
+        .returning(task_model.Task.id)
     )
-    db.commit()
-    return deleted_task
+    deleted = result.first() is not None
+    if deleted:
+        await _bump_task_version(db=db, user_id=user_id)
+    await db.commit()
+    return deleted
 
 
-def update_task_by_id(db: Session, task: task_schema.Task):
+async def update_task_by_id(
+    db: AsyncSession, task_id: UUID, user_id: UUID, values: dict
+):
     """
-    Updates a task in the database by its ID.
+    Updates a task of a user with a single UPDATE ... RETURNING statement.
 
     Parameters:
-    - db (Session): The database session.
-    - task (task_schema.Task): The updated task data.
+    - db (AsyncSession): The database session.
+    - task_id (UUID): The ID of the task to be updated.
+    - user_id (UUID): The ID of the user the task must belong to.
+    - values (dict): The new values of the columns to change. When empty, the
+      task is only read.
 
     Returns:
-    - task_model.Task: The updated task.
-    """
-    db_task = db.query(task_model.Task).filter(task_model.Task.id == task.id).first()
-    if db_task:
-        for key, value in task.__dict__.items():
-            setattr(db_task, key, value)
-        db.commit()
-        db.refresh(db_task)
+    - Row: The task's columns after the update, or None if it doesn't exist or
+      belongs to another user.
+    """
+    conditions = (task_model.Task.id == task_id, task_model.Task.user_id == user_id)
+    if not values:
+        result = await db.execute(select(*TASK_COLUMNS).where(*conditions))
+        return result.first()
+    result = await db.execute(
+        update(task_model.Task)
+        .where(*conditions)
+        .values(**values)
+        .returning(*TASK_COLUMNS)
+    )
+    db_task = result.first()
+    if db_task is not None:
+        await _bump_task_version(db=db, user_id=user_id)
+    await db.commit()
     return db_task
+
+
+async def update_tasks(
+    db: AsyncSession, tasks: List[task_schema.TaskUpdate], user_id: str
+):
+    """
+    Updates several tasks of a user in one transaction.
+
+    The user's tasks among the given IDs are found with a single SELECT, then
+    all of them are written with one executemany UPDATE setting every column,
+    whichever fields actually changed. When an ID is given several times, the
+    last item wins.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - tasks (List[task_schema.TaskUpdate]): The updated data of the tasks.
+    - user_id (str): The ID of the user the tasks must belong to.
+
+    Returns:
+    - Dict[UUID, dict]: The columns of the updated tasks by ID. Tasks that don't
+      exist or belong to another user are missing.
+    """
+    result = await db.execute(
+        select(task_model.Task.id, task_model.Task.created_date).where(
+            task_model.Task.id.in_({task.id for task in tasks}),
+            task_model.Task.user_id == user_id,
+        )
+    )
+    created_dates = dict(result.all())
+    db_tasks = {
+        task.id: {
+            **task.model_dump(),
+            "created_date": created_dates[task.id],
+            "user_id": user_id,
+        }
+        for task in tasks
+        if task.id in created_dates
+    }
+    if db_tasks:
+        table = task_model.Task.__table__
+        await db.execute(
+            update(table)
+            .where(table.c.id == bindparam("task_id"))
+            .values(
+                title=bindparam("new_title"),
+                description=bindparam("new_description"),
+                due_date=bindparam("new_due_date"),
+            ),
+            [
+                {
+                    "task_id": task_id,
+                    "new_title": task["title"],
+                    "new_description": task["description"],
+                    "new_due_date": task["due_date"],
+                }
+                for task_id, task in db_tasks.items()
+            ],
+        )
+        await _bump_task_version(db=db, user_id=user_id)
+    await db.commit()
+    return db_tasks
+
+
+async def delete_tasks(db: AsyncSession, task_ids: List[UUID], user_id: str):
+    """
+    Deletes several tasks of a user with a single DELETE ... RETURNING statement.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - task_ids (List[UUID]): The IDs of the tasks to delete.
+    - user_id (str): The ID of the user the tasks must belong to.
+
+    Returns:
+    - Set[UUID]: The IDs of the deleted tasks. Tasks that don't exist or belong
+      to another user are missing.
+    """
+    result = await db.scalars(
+        delete(task_model.Task)
+        .where(
+            task_model.Task.id.in_(set(task_ids)),
+            task_model.Task.user_id == user_id,
+        )
+        .returning(task_model.Task.id)
+    )
+    deleted_ids = set(result.all())
+    if deleted_ids:
+        await _bump_task_version(db=db, user_id=user_id)
+    await db.commit()
+    return deleted_ids
@@ -1,39 +1,57 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..models import user_model
 from ..schemas import user_schema
 from app.utils import password_hashing
 
 
-def create_user(db: Session, user: user_schema.UserCreate):
+async def create_user(db: AsyncSession, user: user_schema.UserCreate):
     """
     Creates a new user in the database.
 
     Parameters:
-    - db (Session): The database session.
+    - db (AsyncSession): The database session.
     - user (user_schema.UserCreate): The user data for creating a new user.
 
     Returns:
     - user_model.User: The created user.
     """
-    hashed_password = password_hashing.get_password_hash(user.password)
+    hashed_password = await password_hashing.get_password_hash(user.password)
     db_user = user_model.User(
         name=user.name, email=user.email, hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 
-def get_user_by_email(db: Session, email: str):
+async def get_user_by_email(db: AsyncSession, email: str):
     """
     Retrieves a user from the database by their email.
 
     Parameters:
-    - db (Session): The database session.
+    - db (AsyncSession): The database session.
     - email (str): The email of the user to be retrieved.
 
     Returns:
     - user_model.User: The user with the given email, or None if no user was found.
     """
-    return db.query(user_model.User).filter(user_model.User.email == email).first()
+    result = await db.execute(
+        select(user_model.User).where(user_model.User.email == email)
+    )
+    return result.scalars().first()
+
+
+async def get_user_by_id(db: AsyncSession, user_id: str):
+    """
+    Retrieves a user from the database by their ID.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - user_id (str): The ID of the user to be retrieved.
+
+    Returns:
+    - user_model.User: The user with the given ID, or None if no user was found.
+    """
+    return await db.get(user_model.User, user_id)
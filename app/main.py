@@ -1,26 +1,105 @@
-from fastapi import FastAPI, Depends
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.dependencies import Base, engine, get_db
+from app import dependencies
+from app.dependencies import Base
 from app.models import user_model, task_model
-from app.routers import users_router, tasks_router
-
-app = FastAPI(dependencies=[Depends(get_db)])
+from app.routers import (
+    health_router,
+    internal_router,
+    metrics_router,
+    users_router,
+    tasks_router,
+)
+from app.services.write_batcher import write_batcher
+from app.utils.db_usage import DBUsageMiddleware
+from app.utils.load_shedding import LoadSheddingMiddleware
+from app.utils.profiling import ProfilingMiddleware
+from app.utils.query_budget import QueryBudgetMiddleware
+from app.utils.request_metrics import MetricsMiddleware
 
 origins = [
     "http://localhost:3000",  # Your Next.js frontend URL
     "http://localhost:8000",  # Your FastAPI backend URL (optional, usually not needed)
 ]
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Creates the database engine on startup, along with the missing tables and
+    the pre-warmed connections if enabled. On shutdown, it waits for the pending
+    batched writes and releases the engine's pooled connections.
+
+    The readiness probe only succeeds between the end of the startup and the
+    beginning of the shutdown.
+
+    Parameters:
+    - app (FastAPI): The application being served.
+    """
+    engine = dependencies.init_engine(
+        app.state.database_url or dependencies.SQLALCHEMY_DATABASE_URL
+    )
+    if dependencies.DB_CREATE_TABLES:
+        # Replicas normally have the tables already and are only checked, but
+        # local stand-ins for them (e.g. another SQLite file) get them created
+        for async_engine in [engine, *dependencies.replica_engines]:
+            async with async_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+    if dependencies.DB_POOL_PREWARM > 0:
+        await dependencies.prewarm_pool(dependencies.DB_POOL_PREWARM)
+    app.state.ready = True
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        await write_batcher.close()
+        await dependencies.dispose_engine()
+
+
+def create_app(database_url: Optional[str] = None) -> FastAPI:
+    """
+    Builds the FastAPI application.
+
+    Building the app neither connects to the database nor runs any DDL; the
+    engine is created when the app starts serving.
+
+    Parameters:
+    - database_url (Optional[str]): The database the app connects to. Defaults to DATABASE_URL.
+
+    Returns:
+    - FastAPI: The application.
+    """
+    app = FastAPI(lifespan=lifespan)
+    app.state.ready = False
+    app.state.database_url = database_url
+
+    # Added first so it runs inside MetricsMiddleware, which counts the requests it sheds
+    app.add_middleware(LoadSheddingMiddleware)
+    # Added first so they run inside DBUsageMiddleware and see the request's usage
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(QueryBudgetMiddleware)
+    app.add_middleware(DBUsageMiddleware)
+    app.add_middleware(ProfilingMiddleware)
+    # Added last so it is the outermost middleware: every response, including
+    # the 503s of load shedding, carries the CORS headers
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    app.include_router(users_router.router)
+    app.include_router(tasks_router.router)
+    app.include_router(internal_router.router)
+    app.include_router(health_router.router)
+    if metrics_router.METRICS_ENABLED:
+        app.include_router(metrics_router.router)
+    return app
 
 
-app.include_router(users_router.router)
-app.include_router(tasks_router.router)
-Base.metadata.create_all(bind=engine)
+app = create_app()
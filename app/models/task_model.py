@@ -1,9 +1,40 @@
 import uuid
-from sqlalchemy import UUID, Column, Date, ForeignKey, String
+from sqlalchemy import (
+    DDL,
+    UUID,
+    Column,
+    Date,
+    ForeignKey,
+    Index,
+    String,
+    event,
+    func,
+    literal_column,
+)
 from sqlalchemy.orm import relationship
 from ..dependencies import Base
 
 
+def _search_document(title, description):
+    """
+    Builds the `to_tsvector(...)` expression of `search_document` over the given
+    title and description columns, so the index can be declared in the model.
+
+    Parameters:
+    - title (ColumnElement): The title column.
+    - description (ColumnElement): The description column.
+
+    Returns:
+    - ColumnElement: The `to_tsvector(...)` expression.
+    """
+    return func.to_tsvector(
+        literal_column("'english'::regconfig"),
+        func.coalesce(title, literal_column("''"))
+        .op("||")(literal_column("' '"))
+        .op("||")(func.coalesce(description, literal_column("''"))),
+    )
+
+
 class Task(Base):
     """
     SQLAlchemy model for the Task.
@@ -15,6 +46,7 @@ class Task(Base):
     - created_date (Date): The date when the task was created.
     - user_id (UUID): The ID of the user who created the task.
     - created_by (relationship): The relationship to the user who created the task.
+      It is never lazy-loaded: accessing it without eager loading raises.
     - due_date (Date): The due date of the task.
     """
 
@@ -25,5 +57,60 @@ class Task(Base):
     description = Column(String)
     created_date = Column(Date)
     user_id = Column(UUID, ForeignKey("users.id"))
-    created_by = relationship("User", back_populates="tasks")
+    created_by = relationship("User", back_populates="tasks", lazy="raise")
     due_date = Column(Date)
+
+    __table_args__ = (
+        # Composite indexes backing the keyset-paginated task list of a user
+        Index("ix_tasks_user_id_due_date_id", "user_id", "due_date", "id"),
+        Index("ix_tasks_user_id_created_date_id", "user_id", "created_date", "id"),
+        # PostgreSQL searches tasks through a GIN index over their full-text document
+        Index(
+            "ix_tasks_search",
+            _search_document(title, description),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+def search_document():
+    """
+    Builds the PostgreSQL full-text document of a task, from its title and description.
+
+    Every part is rendered inline rather than bound, so the expression in queries
+    is identical to the one of the `ix_tasks_search` index and can use it.
+
+    Returns:
+    - ColumnElement: The `to_tsvector(...)` expression.
+    """
+    return _search_document(Task.title, Task.description)
+
+
+# SQLite searches tasks through an FTS5 table indexing the tasks' title and
+# description, kept in sync with the tasks table by triggers. The tasks table
+# has a UUID primary key, so the index refers to the implicit rowids, which
+# VACUUM may renumber: after a VACUUM, `python -m app.cli upgrade-db` rebuilds it.
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE tasks_fts USING fts5("
+    "title, description, content='tasks', content_rowid='rowid')",
+    "CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.rowid, new.title, new.description); END",
+    "CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.rowid, old.title, old.description); END",
+    "CREATE TRIGGER tasks_fts_update AFTER UPDATE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.rowid, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.rowid, new.title, new.description); END",
+)
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(
+        Task.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    Task.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"),
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import UUID, Column, String
+from sqlalchemy import UUID, Boolean, Column, Integer, String, false
 from sqlalchemy.orm import relationship
 from ..dependencies import Base
 import uuid
@@ -14,6 +14,10 @@ class User(Base):
     - email (str): The email address of the user, which must be unique.
     - hashed_password (str): The hashed password of the user.
     - tasks (relationship): The relationship to the tasks created by the user.
+      It is never lazy-loaded: accessing it without eager loading raises.
+    - task_version (int): Incremented by every write to the user's tasks, it
+      versions the user's task set for conditional requests.
+    - is_admin (bool): Whether the user may read every user's tasks, e.g. for exports.
     """
 
     __tablename__ = "users"
@@ -22,4 +26,6 @@ class User(Base):
     name = Column(String)
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
-    tasks = relationship("Task", back_populates="created_by")
+    tasks = relationship("Task", back_populates="created_by", lazy="raise")
+    task_version = Column(Integer, nullable=False, default=0, server_default="0")
+    is_admin = Column(Boolean, nullable=False, default=False, server_default=false())
@@ -0,0 +1,50 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request
+from sqlalchemy import text
+
+from app import dependencies
+
+# Probes of the process' health for the orchestrator, kept out of the public API schema
+router = APIRouter(prefix="/health", tags=["health"], include_in_schema=False)
+
+# Seconds the readiness probe waits for the database
+READINESS_TIMEOUT = 2
+
+
+@router.get("/live")
+async def liveness():
+    """
+    Reports that the process is up and serving requests. It doesn't touch the
+    database, so a database outage doesn't get healthy workers restarted.
+
+    Returns:
+    - dict: The status of the process.
+    """
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def readiness(request: Request):
+    """
+    Reports whether the app can serve traffic: its startup has completed, it
+    isn't shutting down and the database answers.
+
+    Parameters:
+    - request (Request): The request, used to read the app's state.
+
+    Returns:
+    - dict: The status of the app.
+
+    Raises:
+    - HTTPException(503): If the app isn't ready or the database doesn't answer.
+    """
+    if not getattr(request.app.state, "ready", False) or dependencies.engine is None:
+        raise HTTPException(503, "The app isn't ready")
+    try:
+        async with asyncio.timeout(READINESS_TIMEOUT):
+            async with dependencies.engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+    except Exception:
+        raise HTTPException(503, "The database is unavailable")
+    return {"status": "ready"}
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends
+
+from app import dependencies
+from app.services.task_cache import task_list_cache, task_read_flights
+from app.services.users_service import get_current_admin
+from app.utils.pool_stats import get_pool_status
+
+# Operational endpoints, kept out of the public API schema and restricted to admins
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    include_in_schema=False,
+    dependencies=[Depends(get_current_admin)],
+)
+
+
+@router.get("/pool")
+async def pool_status():
+    """
+    Reports the live state of the database connection pool.
+
+    Returns:
+    - dict: The pool's checked-out, checked-in and overflow connections, the
+      checkouts waiting for a connection, failed checkouts and the checkout
+      wait-time histogram.
+    """
+    return get_pool_status(dependencies.engine.pool)
+
+
+@router.get("/cache")
+async def cache_status():
+    """
+    Reports the hit rate of the task list cache and how many task reads were
+    coalesced.
+
+    Returns:
+    - dict: Whether the cache is enabled, its hits, misses, invalidations and
+      hit rate, and the `coalescing` stats of `task_read_flights`.
+    """
+    return {**task_list_cache.stats(), "coalescing": task_read_flights.stats()}
@@ -0,0 +1,58 @@
+from typing import Annotated, Optional
+import hmac
+import os
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.utils.metrics import render_prometheus
+
+# The metrics expose the app's traffic and internals, so /metrics is only
+# mounted when enabled, and then requires METRICS_TOKEN as a bearer token when set
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true")
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+
+async def verify_metrics_token(
+    authorization: Annotated[Optional[str], Header()] = None,
+):
+    """
+    Checks that a scrape carries METRICS_TOKEN as a bearer token, when one is set.
+
+    Parameters:
+    - authorization (Optional[str]): The Authorization header of the request.
+
+    Raises:
+    - HTTPException(401): If the token is missing or wrong.
+    """
+    if not METRICS_TOKEN:
+        return
+    if not hmac.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(
+            status.HTTP_401_UNAUTHORIZED,
+            "Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+# Prometheus scrape endpoint, kept out of the public API schema
+router = APIRouter(
+    tags=["metrics"],
+    include_in_schema=False,
+    dependencies=[Depends(verify_metrics_token)],
+)
+
+
+class PrometheusResponse(PlainTextResponse):
+    media_type = "text/plain; version=0.0.4"
+
+
+@router.get("/metrics", response_class=PrometheusResponse)
+async def metrics():
+    """
+    Exposes the metrics of this worker process in the Prometheus text format.
+
+    Returns:
+    - str: The rendered metrics.
+    """
+    return render_prometheus()
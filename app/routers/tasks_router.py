@@ -1,41 +1,169 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import date
+from typing import Annotated, Any, List, Literal, Optional
+from uuid import UUID
+import io
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
 
-from app.dependencies import get_db
+from app.dependencies import DBSession
 from app.models.user_model import User
 from app.schemas import task_schema
 from app.utils.jwt_auth import get_current_user
+from app.utils.load_shedding import limit_user_concurrency
+from app.utils.query_budget import query_budget
 import app.services.tasks_service as tasks_service
+import app.services.tasks_import_service as tasks_import_service
 
-router = APIRouter(prefix="/tasks", tags=["tasks"], dependencies=[Depends(get_db)])
+router = APIRouter(
+    prefix="/tasks",
+    tags=["tasks"],
+    # Shares the request's `get_current_user` result with the routes
+    dependencies=[Depends(limit_user_concurrency)],
+)
 
+# Page sizes for the task list
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
 
-@router.get("/")
+# Maximum number of items accepted by a bulk request
+MAX_BULK_ITEMS = 1000
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str):
+    """
+    Checks an If-None-Match header against an entity tag, using weak comparison.
+
+    Parameters:
+    - if_none_match (Optional[str]): The If-None-Match header of the request.
+    - etag (str): The current entity tag.
+
+    Returns:
+    - bool: True if the client already holds the current representation.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque_tag
+        for candidate in if_none_match.split(",")
+    )
+
+
+@router.get("/", response_model=task_schema.TaskPage)
+@query_budget(2)
 async def get_all_tasks_by_user(
-    user: Annotated[User, Depends(get_current_user)], db: Session = Depends(get_db)
+    user: Annotated[User, Depends(get_current_user)],
+    db: DBSession,
+    response: Response,
+    filters: Annotated[task_schema.TaskFilters, Depends()],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    sort: Literal["due_date", "created_date"] = "due_date",
+    if_none_match: Annotated[Optional[str], Header()] = None,
+):
+    """
+    Retrieves a page of the tasks associated with the current user.
+
+    The response carries an ETag derived from the version of the user's tasks.
+    When the request's If-None-Match matches it, a 304 is returned without
+    loading any task.
+
+    Tasks can be narrowed to due and creation date ranges, to overdue tasks and
+    to tasks whose title or description match the words of `q`.
+
+    Parameters:
+    - user (User): The current authenticated user.
+    - db (AsyncSession): The database session.
+    - response (Response): The response, used to set the ETag header.
+    - filters (task_schema.TaskFilters): The filters the tasks must match.
+    - limit (int): The maximum number of tasks in the page.
+    - cursor (Optional[str]): The `next_cursor` of the previous page, if any.
+    - sort (str): The date the tasks are ordered by, "due_date" or "created_date".
+    - if_none_match (Optional[str]): The ETag(s) of the page the client holds.
+
+    Returns:
+    - task_schema.TaskPage: The tasks in the page and the cursor of the next one.
+    """
+    try:
+        # The version is read before the tasks: if a write slips in between, the
+        # page is newer than its ETag, which can only cause a spurious 200.
+        version = await tasks_service.get_task_version(db=db, user_id=user.id)
+        etag = f'W/"{version}"'
+        if filters.overdue:
+            # Which tasks are overdue also depends on the day
+            etag = f'W/"{version}-{date.today().isoformat()}"'
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        page = await tasks_service.get_all_tasks_by_user(
+            db=db,
+            user_id=user.id,
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+            version=version,
+            filters=filters,
+        )
+        response.headers["ETag"] = etag
+        return page
+    except HTTPException as e:
+        raise HTTPException(e.status_code, e.detail)
+
+
+@router.get("/stats", response_model=task_schema.TaskStats)
+@query_budget(2)
+async def get_task_stats(
+    user: Annotated[User, Depends(get_current_user)],
+    db: DBSession,
+    response: Response,
+    if_none_match: Annotated[Optional[str], Header()] = None,
 ):
     """
-    Retrieves all tasks associated with the current user.
+    Retrieves the task counts of the current user: total, overdue, due today
+    and due this week.
+
+    Like the task list, the response carries an ETag derived from the version
+    of the user's tasks and the current day.
 
     Parameters:
     - user (User): The current authenticated user.
-    - db (Session): The database session.
+    - db (AsyncSession): The database session.
+    - response (Response): The response, used to set the ETag header.
+    - if_none_match (Optional[str]): The ETag(s) of the counts the client holds.
 
     Returns:
-    - List[task_schema.Task]: A list of tasks associated with the user.
+    - task_schema.TaskStats: The task counts of the user.
     """
     try:
-        return tasks_service.get_all_tasks_by_user(db=db, email=user.email)
+        version = await tasks_service.get_task_version(db=db, user_id=user.id)
+        etag = f'W/"{version}-{date.today().isoformat()}"'
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        stats = await tasks_service.get_task_stats(
+            db=db, user_id=user.id, version=version
+        )
+        response.headers["ETag"] = etag
+        return stats
     except HTTPException as e:
         raise HTTPException(e.status_code, e.detail)
 
 
-@router.post("/")
+@router.post("/", response_model=task_schema.Task)
+@query_budget(3)
 async def create_task(
     task: task_schema.TaskBase,
     user: Annotated[User, Depends(get_current_user)],
-    db: Session = Depends(get_db),
+    db: DBSession,
 ):
     """
     Creates a new task for the current user.
@@ -43,22 +171,23 @@ async def create_task(
     Parameters:
     - task (task_schema.TaskBase): The task data.
     - user (User): The current authenticated user.
-    - db (Session): The database session.
+    - db (AsyncSession): The database session.
 
     Returns:
     - task_schema.Task: The created task.
     """
     try:
-        return tasks_service.create_task(db=db, task=task, email=user.email)
+        return await tasks_service.create_task(db=db, task=task, user_id=user.id)
     except HTTPException as e:
         raise HTTPException(e.status_code, e.detail)
 
 
-@router.put("/")
+@router.put("/", response_model=task_schema.Task)
+@query_budget(2)
 async def update_task(
     task: task_schema.Task,
     user: Annotated[User, Depends(get_current_user)],
-    db: Session = Depends(get_db),
+    db: DBSession,
 ):
     """
     Updates an existing task for the current user.
@@ -66,37 +195,228 @@ async def update_task(
     Parameters:
     - task (task_schema.Task): The updated task data.
     - user (User): The current authenticated user.
-    - db (Session): The database session.
+    - db (AsyncSession): The database session.
 
     Returns:
     - task_schema.Task: The updated task.
     """
     try:
-        return tasks_service.update_task(db=db, task=task, user_id=user.id)
+        return await tasks_service.update_task(db=db, task=task, user_id=user.id)
+    except HTTPException as e:
+        raise HTTPException(e.status_code, e.detail)
+
+
+@router.get("/export")
+@query_budget(2)
+async def export_tasks(
+    user: Annotated[User, Depends(get_current_user)],
+    db: DBSession,
+    export_format: Annotated[
+        Literal["ndjson", "csv"], Query(alias="format")
+    ] = "ndjson",
+    scope: Literal["mine", "all"] = "mine",
+):
+    """
+    Streams every task of the current user, or of all users for admins, as
+    NDJSON or CSV.
+
+    Parameters:
+    - user (User): The current authenticated user.
+    - db (AsyncSession): The database session.
+    - export_format (str): "ndjson" (one JSON task per line) or "csv", sent as `format`.
+    - scope (str): "mine" for the user's own tasks or "all" for every task (admins only).
+
+    Returns:
+    - StreamingResponse: The exported tasks.
+    """
+    try:
+        chunks = await tasks_service.export_tasks(
+            db=db,
+            user_id=user.id,
+            export_format=export_format,
+            all_users=scope == "all",
+        )
+    except HTTPException as e:
+        raise HTTPException(e.status_code, e.detail)
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="tasks.{export_format}"'
+        },
+    )
+
+
+@router.post("/import", response_model=task_schema.ImportResult)
+@query_budget(None)
+async def import_tasks(
+    file: UploadFile,
+    user: Annotated[User, Depends(get_current_user)],
+    db: DBSession,
+    import_format: Annotated[
+        Optional[Literal["csv", "ndjson"]], Query(alias="format")
+    ] = None,
+):
+    """
+    Imports tasks for the current user from an uploaded CSV or NDJSON file.
+
+    The file is parsed row by row and the valid rows are inserted in large
+    batches, so memory use doesn't grow with the size of the file.
+
+    Parameters:
+    - file (UploadFile): The CSV (with a `title,description,due_date` header) or NDJSON file.
+    - user (User): The current authenticated user.
+    - db (AsyncSession): The database session.
+    - import_format (Optional[str]): "csv" or "ndjson", sent as `format`. Defaults
+      to the file's extension.
+
+    Returns:
+    - task_schema.ImportResult: The number of imported and rejected rows, and
+      why rows were rejected.
+    """
+    if import_format is None:
+        extension = (file.filename or "").rsplit(".", 1)[-1].lower()
+        if extension not in tasks_import_service.IMPORT_FORMATS:
+            raise HTTPException(400, "The import format couldn't be determined")
+        import_format = extension
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return await tasks_import_service.import_tasks(
+            db=db,
+            rows=tasks_import_service.iter_import_rows(stream, import_format),
+            user_id=user.id,
+        )
+    except UnicodeDecodeError:
+        raise HTTPException(400, "The file must be encoded as UTF-8")
+    finally:
+        stream.detach()
+
+
+@router.post("/bulk", response_model=task_schema.BulkResult)
+@query_budget(2)
+async def create_tasks(
+    tasks: Annotated[List[Any], Body(min_length=1, max_length=MAX_BULK_ITEMS)],
+    user: Annotated[User, Depends(get_current_user)],
+    db: DBSession,
+):
+    """
+    Creates several tasks for the current user in one transaction.
+
+    Parameters:
+    - tasks (List[task_schema.TaskBase]): The data of the tasks to create.
+    - user (User): The current authenticated user.
+    - db (AsyncSession): The database session.
+
+    Returns:
+    - task_schema.BulkResult: The outcome of every task, with the validation
+      error of each rejected one.
+    """
+    try:
+        return await tasks_service.create_tasks(db=db, items=tasks, user_id=user.id)
+    except HTTPException as e:
+        raise HTTPException(e.status_code, e.detail)
+
+
+# The SELECT of the owned tasks, their executemany UPDATE and the version bump
+@router.put("/bulk", response_model=task_schema.BulkResult)
+@query_budget(3)
+async def update_tasks(
+    tasks: Annotated[List[Any], Body(min_length=1, max_length=MAX_BULK_ITEMS)],
+    user: Annotated[User, Depends(get_current_user)],
+    db: DBSession,
+):
+    """
+    Updates several tasks of the current user in one transaction.
+
+    Parameters:
+    - tasks (List[task_schema.TaskUpdate]): The updated data of the tasks.
+    - user (User): The current authenticated user.
+    - db (AsyncSession): The database session.
+
+    Returns:
+    - task_schema.BulkResult: The outcome of every task.
+    """
+    try:
+        return await tasks_service.update_tasks(db=db, items=tasks, user_id=user.id)
+    except HTTPException as e:
+        raise HTTPException(e.status_code, e.detail)
+
+
+@router.delete("/bulk", response_model=task_schema.BulkResult)
+@query_budget(2)
+async def delete_tasks(
+    task_ids: Annotated[List[str], Body(min_length=1, max_length=MAX_BULK_ITEMS)],
+    user: Annotated[User, Depends(get_current_user)],
+    db: DBSession,
+):
+    """
+    Deletes several tasks of the current user in one statement.
+
+    Parameters:
+    - task_ids (List[str]): The IDs of the tasks to delete.
+    - user (User): The current authenticated user.
+    - db (AsyncSession): The database session.
+
+    Returns:
+    - task_schema.BulkResult: The outcome of every ID.
+    """
+    try:
+        return await tasks_service.delete_tasks(
+            db=db, task_ids=task_ids, user_id=user.id
+        )
+    except HTTPException as e:
+        raise HTTPException(e.status_code, e.detail)
+
+
+@router.patch("/{task_id}", response_model=task_schema.Task)
+@query_budget(2)
+async def patch_task(
+    task_id: UUID,
+    changes: task_schema.TaskPatch,
+    user: Annotated[User, Depends(get_current_user)],
+    db: DBSession,
+):
+    """
+    Changes some fields of an existing task of the current user.
+
+    Parameters:
+    - task_id (UUID): The ID of the task to change.
+    - changes (task_schema.TaskPatch): The fields to change; the others are kept.
+    - user (User): The current authenticated user.
+    - db (AsyncSession): The database session.
+
+    Returns:
+    - task_schema.Task: The changed task.
+    """
+    try:
+        return await tasks_service.patch_task(
+            db=db, task_id=task_id, changes=changes, user_id=user.id
+        )
     except HTTPException as e:
         raise HTTPException(e.status_code, e.detail)
 
 
 @router.delete("/{task_id}")
+@query_budget(2)
 async def delete_task_by_id(
-    task_id: str,
+    task_id: UUID,
     user: Annotated[User, Depends(get_current_user)],
-    db: Session = Depends(get_db),
+    db: DBSession,
 ):
     """
     Deletes a task by its ID for the current user.
 
     Parameters:
-    - task_id (str): The ID of the task to delete.
+    - task_id (UUID): The ID of the task to delete.
     - user (User): The current authenticated user.
-    - db (Session): The database session.
+    - db (AsyncSession): The database session.
 
     Returns:
     - dict: A dictionary indicating the success of the deletion.
     """
     try:
-        if not tasks_service.delete_task(db=db, task_id=task_id, user_id=user.id):
-            return {"message": "Task deleted successfully"}
-        return {"message": "Error while trying to delete task"}
+        await tasks_service.delete_task(db=db, task_id=task_id, user_id=user.id)
+        return {"message": "Task deleted successfully"}
     except HTTPException as e:
         raise HTTPException(e.status_code, e.detail)
@@ -1,27 +1,28 @@
 from typing import Annotated
 from app.utils.jwt_auth import Token
+from app.utils.query_budget import query_budget
 from fastapi import Depends, HTTPException, APIRouter
 from fastapi.security import OAuth2PasswordRequestForm
 import app.services.users_service as users_service
 from app.schemas.user_schema import UserCreate
-from app.dependencies import get_db
-from sqlalchemy.orm import Session
+from app.dependencies import DBSession
 
 # Define the router for user-related endpoints
-router = APIRouter(prefix="/users", tags=["users"], dependencies=[Depends(get_db)])
+router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.post("/login")
+@query_budget(1)
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: Session = router.dependencies[0],
+    db: DBSession,
 ) -> Token:
     """
     Endpoint for user login. Validates user credentials and returns a JWT token.
 
     Parameters:
     - form_data (OAuth2PasswordRequestForm): The form data containing username and password.
-    - db (Session): The database session.
+    - db (AsyncSession): The database session.
 
     Returns:
     - Token: A JWT token if login is successful.
@@ -30,19 +31,22 @@ async def login_for_access_token(
     - HTTPException: If login fails with appropriate status code and message.
     """
     try:
-        return users_service.login_user(db, form_data.username, form_data.password)
+        return await users_service.login_user(
+            db, form_data.username, form_data.password
+        )
     except HTTPException as e:
-        raise HTTPException(e.status_code, e.detail)
+        raise HTTPException(e.status_code, e.detail, e.headers)
 
 
 @router.post("/signup")
-async def sign_up(user: UserCreate, db: Session = router.dependencies[0]):
+@query_budget(3)
+async def sign_up(user: UserCreate, db: DBSession):
     """
     Endpoint for user registration. Registers a new user and returns the user data along with a JWT token.
 
     Parameters:
     - user (UserCreate): The user data for registration.
-    - db (Session): The database session.
+    - db (AsyncSession): The database session.
 
     Returns:
     - dict: A dictionary containing the created user and a JWT token.
@@ -52,8 +56,8 @@ async def sign_up(user: UserCreate, db: Session = router.dependencies[0]):
     - HTTPException(500): If an unexpected error occurs.
     """
     try:
-        return users_service.register_user(db, user)
+        return await users_service.register_user(db, user)
     except HTTPException as e:
-        raise HTTPException(e.status_code, e.detail)
+        raise HTTPException(e.status_code, e.detail, e.headers)
     except Exception as e:
         raise HTTPException(500, "An error has occurred! Please try again later.")
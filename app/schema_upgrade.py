@@ -0,0 +1,87 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.dependencies import Base
+from app.models import task_model, user_model  # noqa: F401, registers the tables
+
+# `Base.metadata.create_all` only creates missing tables: the columns, indexes
+# and search tables added to existing tables since they were created are added
+# here instead. Every step checks the current schema first, so the upgrade can
+# run any number of times.
+
+
+def _column_names(connection: Connection, table: str) -> set:
+    return {column["name"] for column in inspect(connection).get_columns(table)}
+
+
+def _add_column(connection: Connection, table: str, column: str, definition: str):
+    """
+    Adds a column to a table, unless the table already has it.
+
+    Parameters:
+    - connection (Connection): The connection the upgrade runs on.
+    - table (str): The name of the table.
+    - column (str): The name of the column.
+    - definition (str): The SQL type and constraints of the column.
+    """
+    if column not in _column_names(connection, table):
+        connection.execute(
+            text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        )
+
+
+def _add_task_indexes(connection: Connection):
+    """
+    Creates the indexes of the tasks table that it doesn't have yet: the
+    composite pagination indexes and, on PostgreSQL, the full-text GIN index.
+
+    Parameters:
+    - connection (Connection): The connection the upgrade runs on.
+    """
+    for index in task_model.Task.__table__.indexes:
+        index.create(connection, checkfirst=True)
+
+
+def _add_sqlite_search(connection: Connection):
+    """
+    Creates the FTS5 table searching tasks on SQLite, with its triggers, if
+    missing, and rebuilds it from the existing tasks. The table refers to tasks
+    by their rowids, which VACUUM may renumber, so it is rebuilt on every run.
+
+    Parameters:
+    - connection (Connection): The connection the upgrade runs on.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    if not inspect(connection).has_table("tasks_fts"):
+        for statement in task_model.SQLITE_SEARCH_DDL:
+            connection.execute(text(statement))
+    connection.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"))
+
+
+def upgrade(connection: Connection):
+    """
+    Brings the schema of a database created by an earlier version of the app up
+    to date, creating the missing tables and adding the missing columns,
+    indexes and search tables.
+
+    Parameters:
+    - connection (Connection): The connection the upgrade runs on, in a transaction.
+    """
+    Base.metadata.create_all(connection)
+    _add_column(connection, "users", "task_version", "INTEGER NOT NULL DEFAULT 0")
+    _add_column(connection, "users", "is_admin", "BOOLEAN NOT NULL DEFAULT false")
+    _add_task_indexes(connection)
+    _add_sqlite_search(connection)
+
+
+async def upgrade_schema(engine: AsyncEngine):
+    """
+    Upgrades the schema of the database of an engine, in one transaction.
+
+    Parameters:
+    - engine (AsyncEngine): The engine of the database to upgrade.
+    """
+    async with engine.begin() as connection:
+        await connection.run_sync(upgrade)
@@ -1,5 +1,7 @@
 from datetime import date
-from pydantic import BaseModel
+from typing import List, Optional
+from uuid import UUID
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 
 
 class TaskBase(BaseModel):
@@ -22,11 +24,157 @@ class Task(TaskBase):
     Schema for a task with an ID.
 
     Attributes:
-    - id (str): The unique identifier of the task.
+    - id (UUID): The unique identifier of the task.
+    - created_by (UUID): The ID of the user who created the task, read from the
+      model's `user_id` column.
+    - created_date (Optional[date]): The date when the task was created.
+    - description (Optional[str]): The description of the task, None once cleared.
     """
 
-    id: str
-    created_by: str
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        orm_mode = True
+    id: UUID
+    created_by: UUID = Field(validation_alias=AliasChoices("user_id", "created_by"))
+    created_date: Optional[date] = None
+    description: Optional[str]
+
+
+class TaskFilters(BaseModel):
+    """
+    Schema for the filters of a task listing.
+
+    Attributes:
+    - due_from (Optional[date]): Only tasks due on or after this date.
+    - due_to (Optional[date]): Only tasks due on or before this date.
+    - overdue (bool): Only tasks whose due date has passed.
+    - created_from (Optional[date]): Only tasks created on or after this date.
+    - created_to (Optional[date]): Only tasks created on or before this date.
+    - q (Optional[str]): Only tasks whose title or description match these words.
+    """
+
+    due_from: Optional[date] = None
+    due_to: Optional[date] = None
+    overdue: bool = False
+    created_from: Optional[date] = None
+    created_to: Optional[date] = None
+    q: Optional[str] = Field(None, min_length=1, max_length=200)
+
+
+class TaskPage(BaseModel):
+    """
+    Schema for a page of tasks.
+
+    Attributes:
+    - items (List[Task]): The tasks in the page.
+    - next_cursor (Optional[str]): The opaque cursor of the next page, or None on the last page.
+    """
+
+    items: List[Task]
+    next_cursor: Optional[str] = None
+
+
+class TaskStats(BaseModel):
+    """
+    Schema for the task counts of a user.
+
+    Attributes:
+    - total (int): The number of tasks.
+    - overdue (int): The number of tasks due before today.
+    - due_today (int): The number of tasks due today.
+    - due_this_week (int): The number of tasks due from today to the end of the week (Sunday).
+    """
+
+    total: int
+    overdue: int
+    due_today: int
+    due_this_week: int
+
+
+class TaskUpdate(TaskBase):
+    """
+    Schema for replacing the data of an existing task.
+
+    Attributes:
+    - id (UUID): The unique identifier of the task to update.
+    """
+
+    id: UUID
+
+
+class TaskPatch(BaseModel):
+    """
+    Schema for changing some fields of an existing task. Fields that are left
+    out keep their current value; a null description clears it, while the title
+    and due date, which every task has, can't be null.
+
+    Attributes:
+    - title (str): The new title of the task.
+    - description (Optional[str]): The new description of the task.
+    - due_date (date): The new due date of the task.
+    """
+
+    title: str = None
+    description: Optional[str] = None
+    due_date: date = None
+
+
+class BulkItemResult(BaseModel):
+    """
+    Schema for the outcome of one item of a bulk request.
+
+    Attributes:
+    - index (int): The position of the item in the request.
+    - id (Optional[UUID]): The ID of the task the item refers to, when known.
+    - task (Optional[Task]): The created or updated task, if the item succeeded.
+    - error (Optional[str]): Why the item failed, or None if it succeeded.
+    """
+
+    index: int
+    id: Optional[UUID] = None
+    task: Optional[Task] = None
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    """
+    Schema for the response of a bulk request.
+
+    Attributes:
+    - succeeded (int): The number of items that were applied.
+    - failed (int): The number of items that were rejected.
+    - results (List[BulkItemResult]): The outcome of every item, in request order.
+    """
+
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+class ImportRowError(BaseModel):
+    """
+    Schema for a row rejected by an import.
+
+    Attributes:
+    - line (int): The line of the file the row ends on.
+    - error (str): Why the row was rejected.
+    """
+
+    line: int
+    error: str
+
+
+class ImportResult(BaseModel):
+    """
+    Schema for the outcome of a task import.
+
+    Attributes:
+    - imported (int): The number of tasks inserted.
+    - failed (int): The number of rows rejected.
+    - errors (List[ImportRowError]): The rejected rows, up to a fixed number of them.
+    - errors_truncated (bool): Whether rejected rows were left out of `errors`.
+    """
+
+    imported: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+    errors_truncated: bool = False
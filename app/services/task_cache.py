@@ -0,0 +1,125 @@
+from typing import Awaitable, Callable, Hashable
+from uuid import UUID, uuid4
+import os
+
+from app.utils.cache import CacheBackend, LRUCacheBackend
+from app.utils.metrics import Counter
+from app.utils.single_flight import SingleFlight
+
+# Read-through cache of the task lists and stats served by GET /tasks/. Every
+# worker keeps its own cache, but the lists are keyed by the version of the
+# user's tasks, read from the database on every request, so a write handled by
+# another worker is never served stale. A write also replaces the user's
+# generation on the worker that handled it, dropping the lists of older versions
+# there instead of leaving them to expire after TASK_CACHE_TTL seconds.
+TASK_CACHE_ENABLED = os.getenv("TASK_CACHE_ENABLED", "true").lower() in ("1", "true")
+TASK_CACHE_TTL = float(os.getenv("TASK_CACHE_TTL", "30"))
+TASK_CACHE_SIZE = int(os.getenv("TASK_CACHE_SIZE", "10000"))
+# Identical task reads of a user running at the same time share one query
+TASK_READ_COALESCING_ENABLED = os.getenv(
+    "TASK_READ_COALESCING_ENABLED", "true"
+).lower() in ("1", "true")
+
+task_cache_hits_total = Counter(
+    "task_cache_hits_total", "Task list reads served from the cache."
+)
+task_cache_misses_total = Counter(
+    "task_cache_misses_total", "Task list reads that queried the database."
+)
+task_cache_invalidations_total = Counter(
+    "task_cache_invalidations_total", "Task lists invalidated by a write."
+)
+
+
+class TaskListCache:
+    """
+    Read-through cache of users' task lists.
+
+    Every user has a generation, a random token kept in the backend and part of
+    the key of each of their cached lists. A write replaces the user's
+    generation, which makes all of their cached lists unreachable at once (they
+    then age out of the backend) without touching other users' entries. Since
+    generations are never reused, losing one to eviction can't resurrect stale
+    lists.
+
+    Attributes:
+    - backend (CacheBackend): The store holding the generations and the lists.
+    - enabled (bool): Whether reads are cached at all.
+    """
+
+    def __init__(self, backend: CacheBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+
+    async def _generation(self, user_id: UUID) -> str:
+        key = f"tasks:{user_id}:generation"
+        generation = await self.backend.get(key)
+        if generation is None:
+            generation = uuid4().hex
+            await self.backend.set(key, generation, ttl=float("inf"))
+        return generation
+
+    async def get_or_load(
+        self, user_id: UUID, params: Hashable, load: Callable[[], Awaitable]
+    ):
+        """
+        Returns a user's cached task list, loading and caching it on a miss.
+
+        Parameters:
+        - user_id (UUID): The ID of the user owning the tasks.
+        - params (Hashable): The query parameters the list was read with.
+        - load (Callable[[], Awaitable]): Reads the list from the database.
+
+        Returns:
+        - The cached or freshly loaded task list.
+        """
+        if not self.enabled:
+            return await load()
+        key = f"tasks:{user_id}:{await self._generation(user_id)}:{params!r}"
+        value = await self.backend.get(key)
+        if value is not None:
+            task_cache_hits_total.inc()
+            return value
+        task_cache_misses_total.inc()
+        value = await load()
+        await self.backend.set(key, value)
+        return value
+
+    async def invalidate(self, user_id: UUID):
+        """
+        Drops every cached task list of a user.
+
+        Parameters:
+        - user_id (UUID): The ID of the user whose tasks changed.
+        """
+        if not self.enabled:
+            return
+        task_cache_invalidations_total.inc()
+        await self.backend.set(
+            f"tasks:{user_id}:generation", uuid4().hex, ttl=float("inf")
+        )
+
+    def stats(self) -> dict:
+        """
+        Reports the cache's hit rate.
+
+        Returns:
+        - dict: Whether the cache is enabled, its hits, misses, invalidations and hit rate.
+        """
+        hits, misses = task_cache_hits_total.value, task_cache_misses_total.value
+        return {
+            "enabled": self.enabled,
+            "hits": hits,
+            "misses": misses,
+            "invalidations": task_cache_invalidations_total.value,
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+        }
+
+
+task_list_cache = TaskListCache(
+    LRUCacheBackend(max_size=TASK_CACHE_SIZE, ttl=TASK_CACHE_TTL),
+    enabled=TASK_CACHE_ENABLED,
+)
+
+# In-flight task reads, by user, shared by identical concurrent reads
+task_read_flights = SingleFlight(enabled=TASK_READ_COALESCING_ENABLED)
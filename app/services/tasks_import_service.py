@@ -0,0 +1,116 @@
+from typing import Any, Callable, Iterator, List, Optional, TextIO, Tuple
+from uuid import UUID
+import asyncio
+import csv
+import json
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import tasks_crud
+from app.schemas import task_schema
+from app.services.tasks_service import format_validation_error, mark_tasks_changed
+
+# Number of valid rows inserted per transaction
+IMPORT_BATCH_SIZE = 5000
+# Number of rejected rows described in an import result; the rest are only counted
+IMPORT_MAX_REPORTED_ERRORS = 1000
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+def iter_import_rows(
+    stream: TextIO, import_format: str
+) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    """
+    Parses an import file one row at a time.
+
+    Parameters:
+    - stream (TextIO): The text of the file. CSV files must have a header row
+      naming the `title`, `description` and `due_date` columns; NDJSON files hold
+      one JSON object per line.
+    - import_format (str): "csv" or "ndjson".
+
+    Yields:
+    - Tuple[int, Any, Optional[str]]: The line number, the parsed row and, if the
+      line couldn't be parsed, why.
+    """
+    if import_format == "csv":
+        reader = csv.DictReader(stream)
+        try:
+            for row in reader:
+                yield reader.line_num, row, None
+        except csv.Error as e:
+            yield reader.line_num, None, str(e)
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+
+
+async def import_tasks(
+    db: AsyncSession,
+    rows: Iterator[Tuple[int, Any, Optional[str]]],
+    user_id: UUID,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    on_progress: Optional[Callable[[task_schema.ImportResult], None]] = None,
+):
+    """
+    Validates parsed rows against `task_schema.TaskBase` and inserts the valid
+    ones in batches, one transaction per batch.
+
+    The rows of each batch are read, parsed and validated on a worker thread,
+    so reading the file never blocks the event loop. Only one batch is held in
+    memory at a time, and at most IMPORT_MAX_REPORTED_ERRORS rejected rows are
+    described in the result.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - rows (Iterator[Tuple[int, Any, Optional[str]]]): The rows from `iter_import_rows`.
+    - user_id (UUID): The ID of the user the tasks are imported for.
+    - batch_size (int): The number of valid rows inserted per transaction.
+    - on_progress (Optional[Callable]): Called with the running result after every batch.
+
+    Returns:
+    - task_schema.ImportResult: The number of imported and rejected rows, and
+      why rows were rejected.
+    """
+    result = task_schema.ImportResult()
+
+    def reject(line: int, error: str):
+        result.failed += 1
+        if len(result.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            result.errors.append(task_schema.ImportRowError(line=line, error=error))
+        else:
+            result.errors_truncated = True
+
+    def read_batch() -> List[task_schema.TaskBase]:
+        batch = []
+        for line, row, error in rows:
+            if error is not None:
+                reject(line, error)
+                continue
+            try:
+                batch.append(task_schema.TaskBase.model_validate(row))
+            except ValidationError as e:
+                reject(line, format_validation_error(e))
+                continue
+            if len(batch) >= batch_size:
+                break
+        return batch
+
+    try:
+        while batch := await asyncio.to_thread(read_batch):
+            result.imported += await tasks_crud.import_tasks(
+                db=db, tasks=batch, user_id=user_id
+            )
+            if on_progress is not None:
+                on_progress(result)
+    finally:
+        if result.imported:
+            await mark_tasks_changed(user_id)
+    return result
@@ -1,20 +1,45 @@
+from datetime import date
+from typing import Any, AsyncIterator, List, Optional
+import csv
+import io
+from uuid import UUID
 from fastapi import HTTPException
-from app.crud import tasks_crud
-from app.models.task_model import Task
-from app.models.user_model import User
+from pydantic import ValidationError
+from app.crud import tasks_crud, users_crud
+from app.services.task_cache import task_list_cache, task_read_flights
+from app.services.write_batcher import write_batcher
 from app.schemas import task_schema
-from app.services.users_service import get_user
-from sqlalchemy.orm import Session
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.read_your_writes import read_your_writes
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
-def create_task(db: Session, task: task_schema.TaskBase, email: str):
+async def mark_tasks_changed(user_id: UUID):
+    """
+    Records that a user's tasks changed: their cached task lists are dropped,
+    later reads stop joining the reads already in flight, and their reads are
+    pinned to the primary database for the read-your-writes window. Every write
+    path of the task services calls it.
+
+    Parameters:
+    - user_id (UUID): The ID of the user whose tasks changed.
+    """
+    read_your_writes.pin(user_id)
+    task_read_flights.forget(user_id)
+    await task_list_cache.invalidate(user_id)
+
+
+async def create_task(db: AsyncSession, task: task_schema.TaskBase, user_id: UUID):
     """
     Creates a new task for the specified user.
 
+    With write batching enabled, the task is created in the next batch of
+    `write_batcher` rather than in a transaction of its own.
+
     Parameters:
-    - db (Session): The database session.
+    - db (AsyncSession): The database session.
     - task (task_schema.TaskBase): The task data for creating a new task.
-    - user_id (str): The ID of the user creating the task.
+    - user_id (UUID): The ID of the user creating the task.
 
     Returns:
     - task_model.Task: The created task.
@@ -23,41 +48,184 @@ def create_task(db: Session, task: task_schema.TaskBase, email: str):
     - HTTPException(400): If the task creation fails.
     """
     try:
-        user: User = get_user(db=db, email=email)
-        return tasks_crud.create_task(db=db, task=task, user_id=str(user.id))
+        if write_batcher.enabled:
+            db_task = await write_batcher.create(task=task, user_id=user_id)
+        else:
+            db_task = await tasks_crud.create_task(db=db, task=task, user_id=user_id)
+        await mark_tasks_changed(user_id)
+        return db_task
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-def get_all_tasks_by_user(db: Session, email: str):
+async def get_all_tasks_by_user(
+    db: AsyncSession,
+    user_id: UUID,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    sort: str = "due_date",
+    version: Optional[int] = None,
+    filters: Optional[task_schema.TaskFilters] = None,
+):
     """
-    Retrieves all tasks associated with a specific user based on the provided email.
+    Retrieves a page of the tasks associated with a specific user.
+
+    Pages are served through `task_list_cache`, which the write paths of this
+    module invalidate through `mark_tasks_changed`. When the version of the
+    user's tasks is given it is part of the cache key too, so a page is never
+    served for another version even when the write happened on another worker.
+
+    On a cache miss, identical page reads of the user running at the same time
+    share one query through `task_read_flights`.
 
     Parameters:
-    - db (Session): The database session.
-    - email (str): The email of the user whose tasks are to be retrieved.
+    - db (AsyncSession): The database session.
+    - user_id (UUID): The ID of the user whose tasks are to be retrieved.
+    - limit (Optional[int]): The maximum number of tasks in the page. Defaults to all of them.
+    - cursor (Optional[str]): The cursor returned with the previous page, if any.
+    - sort (str): The date column the tasks are ordered by, "due_date" or "created_date".
+    - version (Optional[int]): The version of the user's tasks, from `get_task_version`.
+    - filters (Optional[task_schema.TaskFilters]): The filters the tasks must match.
 
     Returns:
-    - List[Task]: A list of tasks associated with the user.
+    - task_schema.TaskPage: The tasks in the page and the cursor of the next one.
 
     Raises:
-    - HTTPException(404): If an error occurs while retrieving tasks.
+    - HTTPException(400): If the cursor is invalid or was issued for another sort order.
+    """
+    after = None
+    if cursor:
+        try:
+            cursor_sort, sort_value, task_id = decode_cursor(cursor)
+            if not all(isinstance(value, str) for value in (sort_value, task_id)):
+                raise ValueError("The cursor is malformed")
+            if cursor_sort != sort:
+                raise ValueError("The cursor was issued for another sort order")
+            after = (date.fromisoformat(sort_value), UUID(task_id))
+        except (TypeError, ValueError):
+            raise HTTPException(400, "The cursor is invalid")
+    filters = filters or task_schema.TaskFilters()
+    # Which tasks are overdue changes at midnight, so those pages are keyed by day
+    today = date.today() if filters.overdue else None
+    params = (version, limit, cursor, sort, today, tuple(filters.model_dump().items()))
+    return await task_list_cache.get_or_load(
+        user_id,
+        params,
+        lambda: task_read_flights.do(
+            user_id,
+            "page",
+            params,
+            lambda: _load_task_page(
+                db=db,
+                user_id=user_id,
+                limit=limit,
+                sort=sort,
+                after=after,
+                filters=filters,
+            ),
+        ),
+    )
+
+
+async def _load_task_page(
+    db: AsyncSession,
+    user_id: UUID,
+    limit: Optional[int],
+    sort: str,
+    after: Optional[tuple],
+    filters: Optional[task_schema.TaskFilters] = None,
+):
+    """
+    Reads a page of a user's tasks from the database.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - user_id (UUID): The ID of the user whose tasks are to be retrieved.
+    - limit (Optional[int]): The maximum number of tasks in the page.
+    - sort (str): The date column the tasks are ordered by.
+    - after (Optional[tuple]): The sort key decoded from the page's cursor, if any.
+    - filters (Optional[task_schema.TaskFilters]): The filters the tasks must match.
+
+    Returns:
+    - task_schema.TaskPage: The tasks in the page and the cursor of the next one.
     """
-    user: User = get_user(db=db, email=email)
-    if not user.id:
-        raise HTTPException(
-            404, "An error has occurred while retrieving all the tasks associated"
+    tasks = await tasks_crud.get_tasks_by_user(
+        db=db,
+        user_id=user_id,
+        limit=limit + 1 if limit is not None else None,
+        sort=sort,
+        after=after,
+        filters=filters,
+    )
+    next_cursor = None
+    if limit is not None and len(tasks) > limit:
+        tasks = tasks[:limit]
+        last_task = tasks[-1]
+        next_cursor = encode_cursor(
+            [sort, getattr(last_task, sort).isoformat(), str(last_task.id)]
         )
-    return tasks_crud.get_tasks_by_user(db=db, user_id=user.id)
+    return task_schema.TaskPage(items=tasks, next_cursor=next_cursor)
+
+
+async def get_task_stats(
+    db: AsyncSession, user_id: UUID, version: Optional[int] = None
+):
+    """
+    Retrieves the task counts of a user.
+
+    The counts are served through `task_list_cache`, so repeated dashboard reads
+    cost no query until the user's tasks change or the day does.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - user_id (UUID): The ID of the user whose tasks are counted.
+    - version (Optional[int]): The version of the user's tasks, from `get_task_version`.
+
+    Returns:
+    - task_schema.TaskStats: The total, overdue, due today and due this week counts.
+    """
+    today = date.today()
+
+    async def load():
+        stats = await tasks_crud.get_task_stats(db=db, user_id=user_id, today=today)
+        return task_schema.TaskStats.model_validate(stats, from_attributes=True)
+
+    return await task_list_cache.get_or_load(
+        user_id,
+        ("stats", version, today),
+        lambda: task_read_flights.do(user_id, "stats", (version, today), load),
+    )
+
+
+async def get_task_version(db: AsyncSession, user_id: UUID):
+    """
+    Retrieves the version of a user's task set, which every task write increments.
+
+    Concurrent reads of the same user's version share one query through
+    `task_read_flights`.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - user_id (UUID): The ID of the user.
+
+    Returns:
+    - int: The version of the user's tasks.
+    """
+    return await task_read_flights.do(
+        user_id,
+        "version",
+        None,
+        lambda: tasks_crud.get_task_version(db=db, user_id=user_id),
+    )
 
 
-def get_task_by_id(db: Session, task_id: str):
+async def get_task_by_id(db: AsyncSession, task_id: UUID):
     """
     Retrieves a task based on its ID.
 
     Parameters:
-    - db (Session): The database session.
-    - task_id (str): The ID of the task to be retrieved.
+    - db (AsyncSession): The database session.
+    - task_id (UUID): The ID of the task to be retrieved.
 
     Returns:
     - Task: The task associated with the given ID.
@@ -65,64 +233,361 @@ def get_task_by_id(db: Session, task_id: str):
     Raises:
     - HTTPException(400): If the task ID is invalid.
     """
-    if task_id:
+    if not task_id:
         raise HTTPException(400, "The task id is invalid")
-    return tasks_crud.get_task_by_id(db=db, task_id=task_id)
+    return await tasks_crud.get_task_by_id(db=db, task_id=task_id)
 
 
-def update_task(db: Session, task: task_schema.Task, user_id: str):
+async def _task_not_changed(db: AsyncSession, task_id: UUID, action: str):
     """
-    Updates a task based on the provided task schema and user ID.
+    Explains why a write restricted to the user's own tasks matched no task.
+
+    Only called once the write missed, so successful writes never pay for the
+    extra lookup.
 
     Parameters:
-    - db (Session): The database session.
-    - task (task_schema.Task): The task data to update.
-    - user_id (str): The ID of the user making the update.
+    - db (AsyncSession): The database session.
+    - task_id (UUID): The ID of the task the write targeted.
+    - action (str): The attempted action, e.g. "update", for the error message.
 
     Returns:
-    - Task: The updated task.
+    - HTTPException: A 404 if the task doesn't exist, otherwise a 403.
+    """
+    if await tasks_crud.get_task_by_id(db=db, task_id=task_id) is None:
+        return HTTPException(404, f"The task you're trying to {action} doesn't exist")
+    return HTTPException(
+        403, f"The task you're trying to {action} doesn't belong to you"
+    )
+
+
+async def _update_task(db: AsyncSession, task_id: UUID, user_id: UUID, values: dict):
+    """
+    Updates the given columns of a task of the user in a single statement.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - task_id (UUID): The ID of the task to update.
+    - user_id (UUID): The ID of the user making the update.
+    - values (dict): The new values of the columns to change.
+
+    Returns:
+    - Row: The updated task.
 
     Raises:
-    - HTTPException(400): If the task ID is invalid.
     - HTTPException(404): If the task to update does not exist.
-    - HTTPException(401): If the task does not belong to the user.
+    - HTTPException(403): If the task does not belong to the user.
+    """
+    updated_task = await tasks_crud.update_task_by_id(
+        db=db, task_id=task_id, user_id=user_id, values=values
+    )
+    if updated_task is None:
+        raise await _task_not_changed(db=db, task_id=task_id, action="update")
+    if values:
+        await mark_tasks_changed(user_id)
+    return updated_task
+
+
+async def update_task(db: AsyncSession, task: task_schema.Task, user_id: UUID):
+    """
+    Replaces the title, description and due date of a task of the user.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - task (task_schema.Task): The task data to update.
+    - user_id (UUID): The ID of the user making the update.
+
+    Returns:
+    - Row: The updated task.
+
+    Raises:
     - HTTPException(400): If attempting to transfer the task to another user.
+    - HTTPException(404): If the task to update does not exist.
+    - HTTPException(403): If the task does not belong to the user.
     """
-    if task.id:
-        raise HTTPException(400, "The task id is invalid")
-    old_task: Task = get_task_by_id(db=db, task_id=task.id)
-    if old_task:
-        raise HTTPException(404, "The task you're trying to update doesn't exist")
-    if old_task.created_by != user_id:
-        raise HTTPException(
-            401, "The task you're trying to update doesn't belong to you"
-        )
-    if old_task.created_by != task.created_by:
+    if task.created_by != user_id:
         raise HTTPException(400, "You can't transfer this task to another user")
-    return tasks_crud.update_task_by_id(db=db, task=task)
+    return await _update_task(
+        db=db,
+        task_id=task.id,
+        user_id=user_id,
+        values=task.model_dump(include={"title", "description", "due_date"}),
+    )
 
 
-def delete_task(db: Session, task_id: str, user_id: str):
+async def patch_task(
+    db: AsyncSession, task_id: UUID, changes: task_schema.TaskPatch, user_id: UUID
+):
     """
-    Deletes a task based on its ID and the user ID.
+    Changes the given fields of a task of the user, leaving the others as they are.
 
     Parameters:
-    - db (Session): The database session.
-    - task_id (str): The ID of the task to be deleted.
-    - user_id (str): The ID of the user making the deletion.
+    - db (AsyncSession): The database session.
+    - task_id (UUID): The ID of the task to change.
+    - changes (task_schema.TaskPatch): The fields to change.
+    - user_id (UUID): The ID of the user making the change.
 
     Returns:
-    - Task: The deleted task.
+    - Row: The changed task.
+
+    Raises:
+    - HTTPException(404): If the task to change does not exist.
+    - HTTPException(403): If the task does not belong to the user.
+    """
+    return await _update_task(
+        db=db,
+        task_id=task_id,
+        user_id=user_id,
+        values=changes.model_dump(exclude_unset=True),
+    )
+
+
+async def delete_task(db: AsyncSession, task_id: UUID, user_id: UUID):
+    """
+    Deletes a task of the user in a single statement.
+
+    With write batching enabled, the task is deleted in the next batch of
+    `write_batcher` instead.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - task_id (UUID): The ID of the task to be deleted.
+    - user_id (UUID): The ID of the user making the deletion.
 
     Raises:
     - HTTPException(404): If the task to delete does not exist.
-    - HTTPException(401): If the task does not belong to the user.
+    - HTTPException(403): If the task does not belong to the user.
     """
-    task: Task = tasks_crud.get_task_by_id(db=db, task_id=task_id)
-    if task:
-        raise HTTPException(404, "The task you're trying to delete doesn't exist")
-    if task.created_by != user_id:
-        raise HTTPException(
-            401, "You can't delete this task because it doesn't belong to you"
+    if write_batcher.enabled:
+        deleted = await write_batcher.delete(task_id=task_id, user_id=user_id)
+    else:
+        deleted = await tasks_crud.delete_task_by_id(
+            db=db, task_id=task_id, user_id=user_id
+        )
+    if not deleted:
+        raise await _task_not_changed(db=db, task_id=task_id, action="delete")
+    await mark_tasks_changed(user_id)
+
+
+def format_validation_error(error: ValidationError):
+    """
+    Condenses a pydantic validation error into a single line.
+
+    Parameters:
+    - error (ValidationError): The validation error of a bulk item.
+
+    Returns:
+    - str: The failing fields and their messages.
+    """
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'item'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+def _bulk_result(results: List[task_schema.BulkItemResult]):
+    """
+    Wraps the per-item outcomes of a bulk request into its response.
+
+    Parameters:
+    - results (List[task_schema.BulkItemResult]): The outcome of every item.
+
+    Returns:
+    - task_schema.BulkResult: The bulk response, with the items in request order.
+    """
+    results.sort(key=lambda result: result.index)
+    failed = sum(1 for result in results if result.error is not None)
+    return task_schema.BulkResult(
+        succeeded=len(results) - failed, failed=failed, results=results
+    )
+
+
+async def create_tasks(db: AsyncSession, items: List[Any], user_id: UUID):
+    """
+    Creates several tasks for the specified user in one transaction.
+
+    Every item is validated on its own: invalid items are reported and skipped
+    while the valid ones are inserted together.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - items (List[Any]): The raw data of the tasks to create.
+    - user_id (UUID): The ID of the user creating the tasks.
+
+    Returns:
+    - task_schema.BulkResult: The outcome of every item.
+    """
+    results, indexes, tasks = [], [], []
+    for index, item in enumerate(items):
+        try:
+            tasks.append(task_schema.TaskBase.model_validate(item))
+            indexes.append(index)
+        except ValidationError as e:
+            results.append(
+                task_schema.BulkItemResult(
+                    index=index, error=format_validation_error(e)
+                )
+            )
+    if tasks:
+        db_tasks = await tasks_crud.create_tasks(db=db, tasks=tasks, user_id=user_id)
+        await mark_tasks_changed(user_id)
+        results.extend(
+            task_schema.BulkItemResult(index=index, id=db_task.id, task=db_task)
+            for index, db_task in zip(indexes, db_tasks)
+        )
+    return _bulk_result(results)
+
+
+async def update_tasks(db: AsyncSession, items: List[Any], user_id: UUID):
+    """
+    Updates several tasks of the specified user in one transaction.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - items (List[Any]): The raw updated data of the tasks, each with its ID.
+    - user_id (UUID): The ID of the user making the update.
+
+    Returns:
+    - task_schema.BulkResult: The outcome of every item. Items that are invalid,
+      or refer to tasks that don't exist or belong to another user, are reported
+      as failed.
+    """
+    results, indexes, tasks = [], [], []
+    for index, item in enumerate(items):
+        try:
+            tasks.append(task_schema.TaskUpdate.model_validate(item))
+            indexes.append(index)
+        except ValidationError as e:
+            results.append(
+                task_schema.BulkItemResult(
+                    index=index, error=format_validation_error(e)
+                )
+            )
+    if tasks:
+        db_tasks = await tasks_crud.update_tasks(db=db, tasks=tasks, user_id=user_id)
+        if db_tasks:
+            await mark_tasks_changed(user_id)
+        for index, task in zip(indexes, tasks):
+            db_task = db_tasks.get(task.id)
+            if db_task is None:
+                results.append(
+                    task_schema.BulkItemResult(
+                        index=index,
+                        id=task.id,
+                        error="The task doesn't exist or doesn't belong to you",
+                    )
+                )
+            else:
+                results.append(
+                    task_schema.BulkItemResult(index=index, id=task.id, task=db_task)
+                )
+    return _bulk_result(results)
+
+
+async def delete_tasks(db: AsyncSession, task_ids: List[str], user_id: UUID):
+    """
+    Deletes several tasks of the specified user in one statement.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - task_ids (List[str]): The IDs of the tasks to delete.
+    - user_id (UUID): The ID of the user making the deletion.
+
+    Returns:
+    - task_schema.BulkResult: The outcome of every ID. Invalid IDs, and IDs of
+      tasks that don't exist or belong to another user, are reported as failed.
+    """
+    results, ids = [], {}
+    for index, task_id in enumerate(task_ids):
+        try:
+            ids[index] = UUID(str(task_id))
+        except ValueError:
+            results.append(
+                task_schema.BulkItemResult(index=index, error="The task id is invalid")
+            )
+    if ids:
+        deleted_ids = await tasks_crud.delete_tasks(
+            db=db, task_ids=list(ids.values()), user_id=user_id
+        )
+        if deleted_ids:
+            await mark_tasks_changed(user_id)
+        results.extend(
+            task_schema.BulkItemResult(
+                index=index,
+                id=task_id,
+                error=(
+                    None
+                    if task_id in deleted_ids
+                    else "The task doesn't exist or doesn't belong to you"
+                ),
+            )
+            for index, task_id in ids.items()
+        )
+    return _bulk_result(results)
+
+
+# Columns of the CSV export, in order
+EXPORT_CSV_FIELDS = [
+    "id",
+    "title",
+    "description",
+    "due_date",
+    "created_date",
+    "created_by",
+]
+
+
+async def export_tasks(
+    db: AsyncSession, user_id: UUID, export_format: str, all_users: bool = False
+) -> AsyncIterator[str]:
+    """
+    Prepares the export of a user's tasks, or of every task for admins.
+
+    The ownership checks run before anything is streamed, so a rejected export
+    fails with a proper status code. The returned iterator then reads the tasks
+    through a server-side cursor and renders one chunk per fetched batch.
+
+    Parameters:
+    - db (AsyncSession): The database session.
+    - user_id (UUID): The ID of the user requesting the export.
+    - export_format (str): "ndjson" for one JSON task per line, or "csv".
+    - all_users (bool): Whether to export every user's tasks instead of the user's own.
+
+    Returns:
+    - AsyncIterator[str]: The chunks of the export.
+
+    Raises:
+    - HTTPException(403): If every task is requested by a user who isn't an admin.
+    """
+    if all_users:
+        user = await users_crud.get_user_by_id(db=db, user_id=user_id)
+        if user is None or not user.is_admin:
+            raise HTTPException(403, "Only admins can export every user's tasks")
+    batches = tasks_crud.stream_tasks(db=db, user_id=None if all_users else user_id)
+    if export_format == "csv":
+        return _render_csv(batches)
+    return _render_ndjson(batches)
+
+
+async def _render_ndjson(batches: AsyncIterator) -> AsyncIterator[str]:
+    async for batch in batches:
+        yield "".join(
+            task_schema.Task.model_validate(row).model_dump_json() + "\n"
+            for row in batch
+        )
+
+
+async def _render_csv(batches: AsyncIterator) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_CSV_FIELDS)
+    writer.writeheader()
+    async for batch in batches:
+        writer.writerows(
+            task_schema.Task.model_validate(row).model_dump(mode="json")
+            for row in batch
         )
-    return tasks_crud.delete_task_by_id(db=db, task_id=task_id)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Exports without tasks still get their header
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -1,19 +1,27 @@
 from datetime import timedelta
+from typing import Annotated
 from fastapi import Depends, HTTPException
-from app.utils.jwt_auth import ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token, Token
+from app.dependencies import DBSession
+from app.utils.jwt_auth import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    create_access_token,
+    get_current_user,
+    Token,
+    TokenData,
+)
 from app.utils.password_hashing import verify_password
 from app.models.user_model import User
 import app.crud.users_crud as users_crud
 from app.schemas.user_schema import UserCreate
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
-def get_user(db: Session, email: str):
+async def get_user(db: AsyncSession, email: str):
     """
     Retrieves a user based on the provided email.
 
     Parameters:
-    - db (Session): The database session.
+    - db (AsyncSession): The database session.
     - email (str): The email of the user to be retrieved.
 
     Returns:
@@ -22,36 +30,59 @@ def get_user(db: Session, email: str):
     Raises:
     - HTTPException(400): If the given email doesn't exist.
     """
-    user: User = users_crud.get_user_by_email(db=db, email=email)
+    user: User = await users_crud.get_user_by_email(db=db, email=email)
     if not user:
         raise HTTPException(400, "The given email doesn't exist")
     return user
 
 
-def generate_token(email: str):
+async def get_current_admin(
+    token_data: Annotated[TokenData, Depends(get_current_user)], db: DBSession
+):
     """
-    Generates a JWT token for the given user ID and email.
+    Retrieves the current user, making sure they are an admin.
 
     Parameters:
-    - id (UUID): The ID of the user.
-    - email (str): The email of the user.
+    - token_data (TokenData): The claims of the current user's token.
+    - db (AsyncSession): The database session.
+
+    Returns:
+    - User: The current user.
+
+    Raises:
+    - HTTPException(401): If the token is invalid.
+    - HTTPException(403): If the current user isn't an admin.
+    """
+    user = await users_crud.get_user_by_id(db=db, user_id=token_data.id)
+    if user is None or not user.is_admin:
+        raise HTTPException(403, "Only admins can access this endpoint")
+    return user
+
+
+def generate_token(user: User):
+    """
+    Generates a JWT token for the given user.
+
+    Parameters:
+    - user (User): The user the token is issued to.
 
     Returns:
     - Token: A JWT token with the user's ID and email.
     """
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": email}, expires_delta=access_token_expires
+        data={"sub": user.email, "uid": str(user.id)},
+        expires_delta=access_token_expires,
     )
     return Token(access_token=access_token, token_type="Bearer")
 
 
-def login_user(db: Session, email: str, password: str):
+async def login_user(db: AsyncSession, email: str, password: str):
     """
     Authenticates a user and generates a JWT token if the credentials are valid.
 
     Parameters:
-    - db (Session): The database session.
+    - db (AsyncSession): The database session.
     - email (str): The email of the user attempting to log in.
     - password (str): The password of the user attempting to log in.
 
@@ -61,18 +92,18 @@ def login_user(db: Session, email: str, password: str):
     Raises:
     - HTTPException(401): If the email or password is invalid.
     """
-    user: User = get_user(db=db, email=email)
-    if not verify_password(password, user.hashed_password):
+    user: User = await get_user(db=db, email=email)
+    if not await verify_password(password, user.hashed_password):
         raise HTTPException(401, "Email or password is invalid")
-    return generate_token(user.email)
+    return generate_token(user)
 
 
-def register_user(db: Session, user: UserCreate):
+async def register_user(db: AsyncSession, user: UserCreate):
     """
     Registers a new user and generates a JWT token.
 
     Parameters:
-    - db (Session): The database session.
+    - db (AsyncSession): The database session.
     - user (UserCreate): The user data for registration.
 
     Returns:
@@ -82,13 +113,11 @@ def register_user(db: Session, user: UserCreate):
     - HTTPException(400): If the email is already in use, the name is empty, or the passwords do not match.
     """
     user.name = user.name.strip()
-    if users_crud.get_user_by_email(db=db, email=user.email) != None:
+    if await users_crud.get_user_by_email(db=db, email=user.email) != None:
         raise HTTPException(400, "The email is already in use")
     if len(user.name) == 0:
         raise HTTPException(400, "The name can't be empty")
     if user.password != user.repeat_password:
         raise HTTPException(400, "The passwords doesn't match")
-    return {
-        "user": users_crud.create_user(db=db, user=user),
-        "token": generate_token(user.email),
-    }
+    db_user = await users_crud.create_user(db=db, user=user)
+    return {"user": db_user, "token": generate_token(db_user)}
@@ -0,0 +1,169 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+from uuid import UUID
+import asyncio
+import contextvars
+import os
+
+from app.crud import tasks_crud
+from app.dependencies import SessionLocal
+from app.schemas import task_schema
+from app.utils.metrics import Counter, Histogram
+
+# Group commit of single-task creates and deletes: concurrent writes arriving
+# within WRITE_BATCH_MAX_WAIT_MS of each other are applied in one transaction,
+# so a burst of writes costs one commit instead of one per request.
+WRITE_BATCHING_ENABLED = os.getenv("WRITE_BATCHING_ENABLED", "false").lower() in (
+    "1",
+    "true",
+)
+WRITE_BATCH_MAX_SIZE = int(os.getenv("WRITE_BATCH_MAX_SIZE", "100"))
+WRITE_BATCH_MAX_WAIT_MS = float(os.getenv("WRITE_BATCH_MAX_WAIT_MS", "2"))
+
+task_write_batches_total = Counter(
+    "task_write_batches_total", "Batches of task writes committed together."
+)
+task_write_batch_size = Histogram(
+    "task_write_batch_size",
+    "Task writes committed per batch.",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+task_write_batch_fallbacks_total = Counter(
+    "task_write_batch_fallbacks_total",
+    "Batches that failed and were retried one write at a time.",
+)
+
+
+@dataclass
+class _Write:
+    create: Optional[task_schema.TaskBase]
+    delete: Optional[UUID]
+    user_id: UUID
+    future: asyncio.Future = field(repr=False)
+
+
+class WriteBatcher:
+    """
+    Collects concurrent task creates and deletes and applies them in batches,
+    one transaction per batch.
+
+    A batch is flushed when it holds `max_size` writes or `max_wait` seconds
+    after its first write arrived. Every caller awaits the outcome of its own
+    write: if a batch fails, its writes are retried one by one so only the
+    faulty ones fail.
+
+    Batches run on their own sessions, outside of any request's context, so
+    they aren't attributed to the request that happened to start them.
+
+    Attributes:
+    - session_factory (Callable): Opens the sessions the batches are applied with.
+    - max_size (int): The maximum number of writes in a batch.
+    - max_wait (float): The longest time, in seconds, a write waits for others.
+    - enabled (bool): Whether the task services route writes through the batcher.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        max_size: int = WRITE_BATCH_MAX_SIZE,
+        max_wait: float = WRITE_BATCH_MAX_WAIT_MS / 1000,
+        enabled: bool = WRITE_BATCHING_ENABLED,
+    ):
+        self.session_factory = session_factory
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self.enabled = enabled
+        self._pending: List[_Write] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running = set()
+
+    async def create(self, task: task_schema.TaskBase, user_id: UUID):
+        """
+        Creates a task in the next batch.
+
+        Parameters:
+        - task (task_schema.TaskBase): The data of the task.
+        - user_id (UUID): The ID of the user creating the task.
+
+        Returns:
+        - task_model.Task: The created task.
+        """
+        return await self._submit(create=task, delete=None, user_id=user_id)
+
+    async def delete(self, task_id: UUID, user_id: UUID) -> bool:
+        """
+        Deletes a task of a user in the next batch.
+
+        Parameters:
+        - task_id (UUID): The ID of the task.
+        - user_id (UUID): The ID of the user the task must belong to.
+
+        Returns:
+        - bool: True if the task was deleted, False if it doesn't exist or
+          belongs to another user.
+        """
+        return await self._submit(create=None, delete=task_id, user_id=user_id)
+
+    async def close(self):
+        """
+        Flushes the pending writes and waits for every batch to complete.
+        """
+        self._flush()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    async def _submit(self, **write: Any):
+        loop = asyncio.get_running_loop()
+        self._pending.append(_Write(future=loop.create_future(), **write))
+        future = self._pending[-1].future
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(
+                self.max_wait, self._flush, context=contextvars.Context()
+            )
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(
+            self._apply(batch), context=contextvars.Context()
+        )
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _apply(self, batch: List[_Write]):
+        creates = [write for write in batch if write.create is not None]
+        deletes = [write for write in batch if write.delete is not None]
+        try:
+            async with self.session_factory() as db:
+                db_tasks, deleted_ids = await tasks_crud.apply_task_writes(
+                    db=db,
+                    creates=[(write.create, write.user_id) for write in creates],
+                    deletes=[(write.delete, write.user_id) for write in deletes],
+                )
+        except Exception as e:
+            if len(batch) == 1:
+                if not batch[0].future.done():
+                    batch[0].future.set_exception(e)
+                return
+            task_write_batch_fallbacks_total.inc()
+            for write in batch:
+                await self._apply([write])
+            return
+        task_write_batches_total.inc()
+        task_write_batch_size.observe(len(batch))
+        for write, db_task in zip(creates, db_tasks):
+            if not write.future.done():
+                write.future.set_result(db_task)
+        for write in deletes:
+            if not write.future.done():
+                write.future.set_result(write.delete in deleted_ids)
+
+
+write_batcher = WriteBatcher(SessionLocal)
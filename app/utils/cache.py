@@ -0,0 +1,86 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+import time
+
+
+class CacheBackend(ABC):
+    """
+    Interface of the key-value stores the caches can be backed by.
+
+    Implementations must be safe to share between concurrent requests of a
+    worker. Values are stored as given; backends living outside the process are
+    responsible for serializing them.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Returns the value stored under a key.
+
+        Parameters:
+        - key (str): The key to look up.
+
+        Returns:
+        - Optional[Any]: The value, or None if the key is missing or expired.
+        """
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """
+        Stores a value under a key.
+
+        Parameters:
+        - key (str): The key to store the value under.
+        - value (Any): The value to store.
+        - ttl (Optional[float]): Seconds until the value expires. Defaults to the backend's TTL.
+        """
+
+    @abstractmethod
+    async def delete(self, key: str):
+        """
+        Removes a key, if present.
+
+        Parameters:
+        - key (str): The key to remove.
+        """
+
+
+class LRUCacheBackend(CacheBackend):
+    """
+    In-process cache backend evicting the least recently used entries once it
+    holds `max_size` of them, and expiring entries after their TTL.
+
+    Attributes:
+    - max_size (int): The maximum number of entries kept.
+    - ttl (float): The default number of seconds an entry lives.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,129 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import List, Optional
+from uuid import UUID
+import os
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.utils.metrics import Histogram
+
+# When enabled, every response reports the request's database usage in headers
+DB_USAGE_HEADERS = os.getenv("DB_USAGE_HEADERS", "false").lower() in ("1", "true")
+
+db_statement_duration_seconds = Histogram(
+    "db_statement_duration_seconds",
+    "Time spent executing a SQL statement, as seen by the driver.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+
+@dataclass
+class DBUsage:
+    """
+    Database usage recorded for a single request.
+
+    Attributes:
+    - sessions (int): The number of sessions opened while serving the request.
+    - connections (int): The number of pool connections checked out by the request.
+    - statements (int): The number of SQL statements executed for the request.
+    - statement_seconds (float): The time spent executing those statements.
+    - statement_log (Optional[List[str]]): The SQL of every statement, in order,
+      when the request's statements are being recorded.
+    - session (Optional[AsyncSession]): The request's open session, if any.
+    - user_id (Optional[UUID]): The authenticated user of the request, once known.
+    """
+
+    sessions: int = 0
+    connections: int = 0
+    statements: int = 0
+    statement_seconds: float = 0.0
+    statement_log: Optional[List[str]] = None
+    session: Optional[AsyncSession] = None
+    user_id: Optional[UUID] = None
+
+
+_current_usage: ContextVar[Optional[DBUsage]] = ContextVar("db_usage", default=None)
+
+
+def current_db_usage() -> Optional[DBUsage]:
+    """
+    Returns the database usage of the request being served.
+
+    Returns:
+    - Optional[DBUsage]: The usage of the current request, or None outside of a request.
+    """
+    return _current_usage.get()
+
+
+def track_engine(engine: AsyncEngine):
+    """
+    Attributes every connection checked out of the engine's pool, and every
+    SQL statement executed on it, to the request being served. Statement
+    durations are also recorded in `db_statement_duration_seconds`.
+
+    Parameters:
+    - engine (AsyncEngine): The engine whose pool checkouts and statements are counted.
+    """
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def count_checkout(dbapi_connection, connection_record, connection_proxy):
+        usage = _current_usage.get()
+        if usage is not None:
+            usage.connections += 1
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def start_statement(connection, cursor, statement, parameters, context, many):
+        context._statement_start = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def count_statement(connection, cursor, statement, parameters, context, many):
+        elapsed = time.perf_counter() - context._statement_start
+        db_statement_duration_seconds.observe(elapsed)
+        usage = _current_usage.get()
+        if usage is not None:
+            usage.statements += 1
+            usage.statement_seconds += elapsed
+            if usage.statement_log is not None:
+                usage.statement_log.append(statement)
+
+
+class DBUsageMiddleware:
+    """
+    ASGI middleware giving each HTTP request its own DBUsage record.
+
+    The record is available through `current_db_usage()` while the request is
+    served and as `request.state.db_usage` afterwards. With DB_USAGE_HEADERS
+    enabled, the counters are also sent as `X-DB-Sessions`, `X-DB-Connections`
+    and `X-DB-Statements` response headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        usage = DBUsage()
+        scope.setdefault("state", {})["db_usage"] = usage
+        token = _current_usage.set(usage)
+
+        async def send_with_usage(message):
+            if DB_USAGE_HEADERS and message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [
+                    *message["headers"],
+                    (b"x-db-sessions", str(usage.sessions).encode()),
+                    (b"x-db-connections", str(usage.connections).encode()),
+                    (b"x-db-statements", str(usage.statements).encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_usage)
+        finally:
+            _current_usage.reset(token)
@@ -1,5 +1,10 @@
+from collections import OrderedDict
 from datetime import timedelta, timezone, datetime
-from typing import Annotated, Union
+from typing import Annotated, Optional, Union
+from uuid import UUID
+import hashlib
+import threading
+import time
 from fastapi import Depends, HTTPException, status
 import jwt
 from pydantic import BaseModel
@@ -7,6 +12,9 @@ from jwt.exceptions import InvalidTokenError
 import os
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 
+from app.utils.db_usage import current_db_usage
+from app.utils.metrics import Counter, Histogram
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 SECRET_KEY = (
@@ -16,6 +24,11 @@ SECRET_KEY = (
 )
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Version of the token claims. Tokens issued with another version (such as the
+# email-only tokens issued before the user ID was added) are rejected.
+TOKEN_VERSION = 2
+# Maximum number of verified tokens kept in memory; 0 disables the cache
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
 
 
 class Token(BaseModel):
@@ -37,14 +50,104 @@ class TokenData(BaseModel):
 
     Attributes:
     - email (Union[str, None]): The email extracted from the token payload.
+    - id (Union[UUID, None]): The user ID extracted from the token payload.
     """
 
     email: Union[str, None] = None
+    id: Union[UUID, None] = None
+
+
+token_cache_hits_total = Counter(
+    "jwt_token_cache_hits_total", "Tokens served from the verified-token cache."
+)
+token_cache_misses_total = Counter(
+    "jwt_token_cache_misses_total", "Tokens that had to be decoded and verified."
+)
+jwt_decode_seconds = Histogram(
+    "jwt_decode_seconds",
+    "Time spent decoding and verifying the signature of a token.",
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005),
+)
+
+
+class TokenCache:
+    """
+    Bounded, least-recently-used cache of verified token claims.
+
+    Entries are keyed by the SHA-256 digest of the token, so raw tokens are never
+    kept in memory, and every entry expires at the token's own expiry time: an
+    expired token is never served from the cache.
+
+    Attributes:
+    - max_size (int): The maximum number of tokens kept. 0 disables the cache.
+    - hits (Counter): Lookups answered from the cache.
+    - misses (Counter): Lookups that required decoding the token.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = token_cache_hits_total
+        self.misses = token_cache_misses_total
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[TokenData]:
+        """
+        Returns the cached claims of a token, if it was verified and hasn't expired.
+
+        Parameters:
+        - token (str): The encoded JWT token.
+
+        Returns:
+        - Optional[TokenData]: The token data, or None if the token must be decoded.
+        """
+        if self.max_size <= 0:
+            return None
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses.inc()
+                return None
+            self._entries.move_to_end(key)
+            self.hits.inc()
+            return entry[0]
+
+    def set(self, token: str, token_data: TokenData, expires_at: float):
+        """
+        Caches the claims of a verified token until it expires.
+
+        Parameters:
+        - token (str): The encoded JWT token.
+        - token_data (TokenData): The claims extracted from the token.
+        - expires_at (float): The token's expiry, as a UNIX timestamp.
+        """
+        if self.max_size <= 0:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (token_data, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+token_cache = TokenCache(TOKEN_CACHE_SIZE)
 
 
 def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None):
     """
-    Creates a JWT access token.
+    Creates a JWT access token carrying the current claims version.
 
     Parameters:
     - data (dict): The data to encode in the token.
@@ -58,20 +161,57 @@ def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None
         expire = datetime.now(timezone.utc) + expires_delta
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "ver": TOKEN_VERSION})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+def _verify_token(token: str, credentials_exception: HTTPException) -> TokenData:
+    """
+    Decodes a token, checks its signature and claims and caches its claims.
+
+    Parameters:
+    - token (str): The JWT token.
+    - credentials_exception (HTTPException): The error raised for invalid tokens.
+
+    Returns:
+    - TokenData: The token data containing the user's email and ID.
+
+    Raises:
+    - HTTPException(401): If the token is invalid.
+    """
+    try:
+        start = time.perf_counter()
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        finally:
+            jwt_decode_seconds.observe(time.perf_counter() - start)
+        email: str = payload.get("sub")
+        user_id: str = payload.get("uid")
+        if email is None or user_id is None:
+            raise credentials_exception
+        if payload.get("ver") != TOKEN_VERSION:
+            raise credentials_exception
+        token_data = TokenData(email=email, id=UUID(user_id))
+    except (InvalidTokenError, ValueError):
+        raise credentials_exception
+    if isinstance(payload.get("exp"), (int, float)):
+        token_cache.set(token, token_data, payload["exp"])
+    return token_data
+
+
 async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
     """
-    Retrieves the current user from the JWT token.
+    Retrieves the current user from the JWT token, without querying the database.
+
+    Tokens verified by a previous request are served from `token_cache` until
+    they expire, skipping the signature check and payload parsing.
 
     Parameters:
     - token (Annotated[str, Depends]): The JWT token.
 
     Returns:
-    - TokenData: The token data containing the user's email.
+    - TokenData: The token data containing the user's email and ID.
 
     Raises:
     - HTTPException(401): If the token is invalid or the credentials could not be validated.
@@ -81,12 +221,11 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
-    except InvalidTokenError:
-        raise credentials_exception
+    token_data = token_cache.get(token)
+    if token_data is None:
+        token_data = _verify_token(token, credentials_exception)
+    # Recorded for the request so its reads can honor read-your-writes
+    usage = current_db_usage()
+    if usage is not None:
+        usage.user_id = token_data.id
     return token_data
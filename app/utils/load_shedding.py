@@ -0,0 +1,153 @@
+from collections import defaultdict
+from typing import Annotated, Dict, Optional
+from uuid import UUID
+import os
+
+from fastapi import Depends, HTTPException, status
+from starlette.responses import JSONResponse
+
+from app import dependencies
+from app.utils.jwt_auth import TokenData, get_current_user
+from app.utils.metrics import Counter, Gauge
+
+# Requests are rejected with a 503 before reaching their route once more than
+# LOAD_SHED_MAX_POOL_WAITING checkouts are waiting for a database connection,
+# or more than LOAD_SHED_MAX_IN_FLIGHT requests are being served by the worker.
+# 0 disables either check.
+LOAD_SHED_MAX_POOL_WAITING = int(os.getenv("LOAD_SHED_MAX_POOL_WAITING", "10"))
+LOAD_SHED_MAX_IN_FLIGHT = int(os.getenv("LOAD_SHED_MAX_IN_FLIGHT", "200"))
+# Seconds clients are asked to wait before retrying a rejected request
+LOAD_SHED_RETRY_AFTER = int(os.getenv("LOAD_SHED_RETRY_AFTER", "1"))
+# Path prefixes that are never shed, so probes and scrapes keep working
+LOAD_SHED_EXEMPT_PATHS = ("/health", "/metrics", "/internal")
+# Maximum number of requests a single user may have in flight on a worker;
+# 0 disables the limit
+USER_MAX_IN_FLIGHT = int(os.getenv("USER_MAX_IN_FLIGHT", "10"))
+
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."
+)
+load_shed_requests_total = Counter(
+    "load_shed_requests_total",
+    "HTTP requests rejected before being served because the worker was overloaded.",
+    labelnames=("reason",),
+)
+user_concurrency_rejections_total = Counter(
+    "user_concurrency_rejections_total",
+    "HTTP requests rejected because their user had too many requests in flight.",
+)
+
+
+def _pool_waiting() -> int:
+    """
+    Counts the checkouts waiting for a connection in the app's pools.
+
+    Returns:
+    - int: The largest number of waiting checkouts among the primary and replica pools.
+    """
+    engines = [dependencies.engine, *dependencies.replica_engines]
+    return max(
+        (
+            getattr(engine.pool, "waiting", 0)
+            for engine in engines
+            if engine is not None
+        ),
+        default=0,
+    )
+
+
+def shed_reason(in_flight: int, pool_waiting: int) -> Optional[str]:
+    """
+    Decides whether a new request must be rejected.
+
+    Parameters:
+    - in_flight (int): The number of requests already being served.
+    - pool_waiting (int): The number of checkouts waiting for a connection.
+
+    Returns:
+    - Optional[str]: Why the request must be rejected, or None to admit it.
+    """
+    if 0 < LOAD_SHED_MAX_POOL_WAITING < pool_waiting:
+        return "pool"
+    if 0 < LOAD_SHED_MAX_IN_FLIGHT <= in_flight:
+        return "in_flight"
+    return None
+
+
+class LoadSheddingMiddleware:
+    """
+    ASGI middleware rejecting requests with a 503 and Retry-After when the
+    worker is overloaded, instead of letting them queue for a connection until
+    the pool timeout.
+
+    A request is rejected when more than LOAD_SHED_MAX_POOL_WAITING checkouts
+    are already waiting for a connection, or when LOAD_SHED_MAX_IN_FLIGHT
+    requests are already being served. Requests under LOAD_SHED_EXEMPT_PATHS
+    are always served.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(LOAD_SHED_EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        reason = shed_reason(self.in_flight, _pool_waiting())
+        if reason is not None:
+            load_shed_requests_total.labels(reason=reason).inc()
+            response = JSONResponse(
+                {"detail": "The server is busy, please try again later"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(LOAD_SHED_RETRY_AFTER)},
+            )
+            await response(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        http_requests_in_flight.set(self.in_flight)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+            http_requests_in_flight.set(self.in_flight)
+
+
+# Requests in flight per user on this worker
+_user_in_flight: Dict[UUID, int] = defaultdict(int)
+
+
+async def limit_user_concurrency(
+    user: Annotated[TokenData, Depends(get_current_user)],
+):
+    """
+    Caps the number of requests a user may have in flight at USER_MAX_IN_FLIGHT,
+    so one client can't hold every connection of the pool.
+
+    The count is kept per worker process.
+
+    Parameters:
+    - user (TokenData): The user making the request.
+
+    Yields:
+    - TokenData: The user, once the request is admitted.
+
+    Raises:
+    - HTTPException(429): If the user already has too many requests in flight.
+    """
+    if 0 < USER_MAX_IN_FLIGHT <= _user_in_flight[user.id]:
+        user_concurrency_rejections_total.inc()
+        raise HTTPException(
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            "Too many concurrent requests, please try again later",
+            headers={"Retry-After": str(LOAD_SHED_RETRY_AFTER)},
+        )
+    _user_in_flight[user.id] += 1
+    try:
+        yield user
+    finally:
+        _user_in_flight[user.id] -= 1
+        if not _user_in_flight[user.id]:
+            del _user_in_flight[user.id]
@@ -0,0 +1,246 @@
+from bisect import bisect_left
+from typing import Dict, Sequence, Tuple
+import threading
+
+# Every metric created in the process, by name
+REGISTRY: Dict[str, "Metric"] = {}
+
+# Default histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric:
+    """
+    Base class for in-process metrics, optionally split by labels.
+
+    Attributes:
+    - name (str): The unique name of the metric.
+    - description (str): A human readable description of what is measured.
+    - labelnames (Sequence[str]): The names of the labels the metric is split by.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        REGISTRY[name] = self
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, **labels):
+        """
+        Returns the series of the metric for the given label values.
+
+        Parameters:
+        - labels: A value for each of the metric's label names.
+
+        Returns:
+        - The series for the given label values, created on first use.
+        """
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def series(self):
+        """
+        Returns every series of the metric.
+
+        Returns:
+        - List[Tuple[Dict[str, str], object]]: The label values and series pairs.
+        """
+        return [
+            (dict(zip(self.labelnames, key)), child)
+            for key, child in list(self._children.items())
+        ]
+
+
+class _CounterValue:
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class Counter(Metric):
+    """
+    A monotonically increasing count of events.
+    """
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterValue()
+
+    def inc(self, amount: float = 1):
+        """
+        Increments the unlabelled series of the counter.
+
+        Parameters:
+        - amount (float): The amount to add. Defaults to 1.
+        """
+        self.labels().inc(amount)
+
+    @property
+    def value(self):
+        return self.labels().value
+
+
+class _GaugeValue:
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+
+class Gauge(Metric):
+    """
+    A value that can go up and down, such as a queue depth.
+    """
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeValue()
+
+    def set(self, value: float):
+        """
+        Sets the unlabelled series of the gauge.
+
+        Parameters:
+        - value (float): The current value.
+        """
+        self.labels().set(value)
+
+    @property
+    def value(self):
+        return self.labels().value
+
+
+class _HistogramValue:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+
+class Histogram(Metric):
+    """
+    A distribution of observed values, counted into cumulative buckets.
+
+    Attributes:
+    - buckets (Sequence[float]): The upper bounds of the buckets, in ascending order.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, description, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        """
+        Records a value in the unlabelled series of the histogram.
+
+        Parameters:
+        - value (float): The observed value.
+        """
+        self.labels().observe(value)
+
+    def snapshot(self):
+        """
+        Returns the count, sum and cumulative bucket counts of the unlabelled series.
+
+        Returns:
+        - dict: The snapshot of the histogram.
+        """
+        return self.labels().snapshot()
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return format(value, "g") if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = (
+        '{}="{}"'.format(
+            name,
+            value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'),
+        )
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(pairs) + "}"
+
+
+def render_prometheus(registry: Dict[str, Metric] = REGISTRY) -> str:
+    """
+    Renders metrics in the Prometheus text exposition format.
+
+    Parameters:
+    - registry (Dict[str, Metric]): The metrics to render. Defaults to every metric of the process.
+
+    Returns:
+    - str: One HELP and TYPE header per metric, followed by its samples.
+    """
+    lines = []
+    for name, metric in sorted(registry.items()):
+        lines.append(f"# HELP {name} {metric.description}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for labels, child in metric.series():
+            if metric.kind != "histogram":
+                lines.append(
+                    f"{name}{_format_labels(labels)} {_format_value(child.value)}"
+                )
+                continue
+            cumulative = 0
+            for bound, count in zip((*child.buckets, float("inf")), child.counts):
+                cumulative += count
+                bucket_labels = {**labels, "le": _format_value(float(bound))}
+                lines.append(
+                    f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}"
+                )
+            lines.append(f"{name}_sum{_format_labels(labels)} {child.sum}")
+            lines.append(f"{name}_count{_format_labels(labels)} {child.count}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,40 @@
+import base64
+import json
+from typing import Any, List
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """
+    Encodes the sort key of the last row of a page into an opaque cursor.
+
+    Parameters:
+    - values (List[Any]): The JSON serializable sort key values.
+
+    Returns:
+    - str: The URL-safe cursor.
+    """
+    payload = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """
+    Decodes a cursor created by `encode_cursor`.
+
+    Parameters:
+    - cursor (str): The cursor received from a client.
+
+    Returns:
+    - List[Any]: The sort key values stored in the cursor.
+
+    Raises:
+    - ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("The cursor is invalid") from e
+    if not isinstance(values, list):
+        raise ValueError("The cursor is invalid")
+    return values
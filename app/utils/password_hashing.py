@@ -1,12 +1,84 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+import time
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
+from app.utils.metrics import Counter, Gauge, Histogram
+
 # Setting up the CryptContext for password hashing using bcrypt
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt runs on a bounded thread pool (it releases the GIL while hashing) so it
+# never blocks the event loop. At most PASSWORD_HASH_WORKERS hashes run at once
+# and up to PASSWORD_HASH_QUEUE_LIMIT more may wait; beyond that requests are
+# rejected right away with a 503.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "16"))
+
+_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_pending = 0
+
+password_hash_seconds = Histogram(
+    "password_hash_seconds",
+    "Time to hash or verify a password, including the wait for a worker.",
+    labelnames=("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+password_hash_queue_depth = Gauge(
+    "password_hash_queue_depth", "Password hashing jobs waiting for a worker."
+)
+password_hash_rejections_total = Counter(
+    "password_hash_rejections_total",
+    "Password hashing jobs rejected because the queue was full.",
+)
+
+
+async def _run_in_pool(operation: str, function, *args):
+    """
+    Runs a bcrypt operation on the hashing pool, applying admission control.
+
+    Parameters:
+    - operation (str): The name of the operation, used as a metric label.
+    - function (Callable): The blocking function to run.
+    - args: The arguments of the function.
+
+    Returns:
+    - The result of the function.
+
+    Raises:
+    - HTTPException(503): If the hashing queue is full.
+    """
+    global _pending
+    if _pending >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_LIMIT:
+        password_hash_rejections_total.inc()
+        raise HTTPException(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            "The server is busy, please try again later",
+            headers={"Retry-After": "1"},
+        )
+    _pending += 1
+    password_hash_queue_depth.set(max(_pending - PASSWORD_HASH_WORKERS, 0))
+    start = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            _executor, function, *args
+        )
+    finally:
+        _pending -= 1
+        password_hash_queue_depth.set(max(_pending - PASSWORD_HASH_WORKERS, 0))
+        password_hash_seconds.labels(operation=operation).observe(
+            time.perf_counter() - start
+        )
+
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    Verifies a plain password against a hashed password.
+    Verifies a plain password against a hashed password on the hashing pool.
 
     Parameters:
     - plain_password (str): The plain text password to verify.
@@ -14,18 +86,26 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
     Returns:
     - bool: True if the password matches, False otherwise.
+
+    Raises:
+    - HTTPException(503): If the hashing queue is full.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return await _run_in_pool(
+        "verify", pwd_context.verify, plain_password, hashed_password
+    )
 
 
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """
-    Hashes a plain password.
+    Hashes a plain password on the hashing pool.
 
     Parameters:
     - password (str): The plain text password to hash.
 
     Returns:
     - str: The hashed password.
+
+    Raises:
+    - HTTPException(503): If the hashing queue is full.
     """
-    return pwd_context.hash(password)
+    return await _run_in_pool("hash", pwd_context.hash, password)
@@ -0,0 +1,97 @@
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+from app.utils.metrics import Counter, Histogram
+
+# Checkout waits are usually well under a millisecond; longer waits mean the pool is saturated
+POOL_WAIT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+)
+
+pool_checkout_wait_seconds = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time checkouts spent waiting for a connection to be returned to the pool; "
+    "0 for checkouts served without waiting.",
+    buckets=POOL_WAIT_BUCKETS,
+)
+pool_checkout_failures_total = Counter(
+    "db_pool_checkout_failures_total",
+    "Connection checkouts that timed out or failed to connect.",
+)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that measures how long checkouts wait for a connection
+    and how many checkouts fail.
+
+    A checkout only waits when every connection the pool may open, overflow
+    included, is checked out. Checkouts taking an idle connection or opening a
+    new one don't wait, so the time spent connecting isn't counted as waiting.
+
+    Attributes:
+    - waiting (int): The number of checkouts currently waiting for a connection.
+    """
+
+    waiting = 0
+
+    def _exhausted(self) -> bool:
+        return (
+            self._max_overflow > -1
+            and self.checkedout() >= self.size() + self._max_overflow
+        )
+
+    def _do_get(self):
+        blocking = self._exhausted()
+        if blocking:
+            self.waiting += 1
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            pool_checkout_failures_total.inc()
+            raise
+        finally:
+            if blocking:
+                self.waiting -= 1
+            pool_checkout_wait_seconds.observe(
+                time.perf_counter() - start if blocking else 0
+            )
+        return connection
+
+
+def get_pool_status(pool: Pool) -> dict:
+    """
+    Reports the live state of a connection pool.
+
+    Parameters:
+    - pool (Pool): The pool to report on.
+
+    Returns:
+    - dict: The pool size, checked-in, checked-out and overflow connections, the
+      checkouts waiting for a connection, the number of failed checkouts and the
+      checkout wait-time histogram. Counters a pool doesn't keep are reported as None.
+    """
+    queue_pool = isinstance(pool, AsyncAdaptedQueuePool)
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size() if queue_pool else None,
+        "checked_in": pool.checkedin() if queue_pool else None,
+        "checked_out": pool.checkedout() if queue_pool else None,
+        "overflow": max(pool.overflow(), 0) if queue_pool else None,
+        "waiting": getattr(pool, "waiting", None),
+        "checkout_failures": pool_checkout_failures_total.value,
+        "checkout_wait_seconds": pool_checkout_wait_seconds.snapshot(),
+    }
@@ -0,0 +1,162 @@
+from datetime import datetime, timezone
+from typing import Optional
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import os
+import random
+import re
+import time
+
+# Requests are only ever profiled when enabled, either because they carry a
+# valid signed X-Profile header or because they were sampled.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true")
+# Key signing X-Profile headers; without it, only sampling triggers profiles
+PROFILING_SECRET = os.getenv("PROFILING_SECRET", "")
+# Fraction of requests profiled without a header, e.g. 0.001
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+# Path prefixes of the requests that may be profiled
+PROFILING_PATHS = tuple(
+    prefix.strip()
+    for prefix in os.getenv("PROFILING_PATHS", "/tasks,/users").split(",")
+    if prefix.strip()
+)
+# Directory the profiles are written to, and the number of profiles kept there
+PROFILING_DIR = os.getenv("PROFILING_DIR", "profiles")
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", "50"))
+
+# Longest time an X-Profile header may be valid for, so a leaked header can't
+# be replayed indefinitely
+MAX_SIGNATURE_TTL = 3600
+
+
+def sign_profile_request(secret: str, expires_at: int) -> str:
+    """
+    Builds the value of an X-Profile header requesting a profile.
+
+    Parameters:
+    - secret (str): The PROFILING_SECRET of the server.
+    - expires_at (int): The Unix time the header stops being accepted at.
+
+    Returns:
+    - str: The header value, "<expires_at>:<HMAC-SHA256 signature>".
+    """
+    signature = hmac.new(
+        secret.encode(), str(expires_at).encode(), hashlib.sha256
+    ).hexdigest()
+    return f"{expires_at}:{signature}"
+
+
+def verify_profile_request(secret: str, header: Optional[str]) -> bool:
+    """
+    Checks an X-Profile header.
+
+    Parameters:
+    - secret (str): The PROFILING_SECRET of the server.
+    - header (Optional[str]): The X-Profile header of the request.
+
+    Returns:
+    - bool: True if the header is signed with the secret and still valid.
+    """
+    if not secret or not header:
+        return False
+    expires_at, _, _ = header.partition(":")
+    try:
+        remaining = int(expires_at) - time.time()
+    except ValueError:
+        return False
+    if not 0 < remaining <= MAX_SIGNATURE_TTL:
+        return False
+    return hmac.compare_digest(header, sign_profile_request(secret, int(expires_at)))
+
+
+def prune_profiles(directory: str, keep: int):
+    """
+    Deletes the oldest profiles of a directory, keeping the `keep` newest.
+
+    Parameters:
+    - directory (str): The profile directory.
+    - keep (int): The number of profiles to keep.
+    """
+    profiles = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith(".pstats")),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in profiles[: max(len(profiles) - keep, 0)]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+def _write_profile(profiler: cProfile.Profile, path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    profiler.dump_stats(path)
+    prune_profiles(os.path.dirname(path) or ".", PROFILING_MAX_FILES)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling selected requests with cProfile and writing
+    their profiles, in pstats format, to PROFILING_DIR.
+
+    A request under one of PROFILING_PATHS is profiled when it carries an
+    X-Profile header signed with PROFILING_SECRET (see `sign_profile_request`),
+    or at random with probability PROFILING_SAMPLE_RATE. Its response then
+    carries the profile's file name in X-Profile-File. Only PROFILING_MAX_FILES
+    profiles are kept.
+
+    cProfile follows the event loop's thread, so a profile also contains
+    whatever concurrent requests ran meanwhile, and misses the work handed to
+    other threads (bcrypt, SQLite). Only one request is profiled at a time;
+    others arriving meanwhile are served unprofiled.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._profiling = False
+
+    def _should_profile(self, scope) -> bool:
+        if not scope["path"].startswith(PROFILING_PATHS):
+            return False
+        header = dict(scope["headers"]).get(b"x-profile")
+        if header is not None:
+            return verify_profile_request(PROFILING_SECRET, header.decode("latin-1"))
+        return PROFILING_SAMPLE_RATE > 0 and random.random() < PROFILING_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if (
+            not PROFILING_ENABLED
+            or scope["type"] != "http"
+            or self._profiling
+            or not self._should_profile(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        path = re.sub(r"[^A-Za-z0-9]+", "-", scope["path"]).strip("-")
+        filename = f"{timestamp}-{scope['method']}-{path or 'root'}.pstats"
+
+        async def send_with_profile(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-profile-file", filename.encode()),
+                ]
+            await send(message)
+
+        self._profiling = True
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            profiler.disable()
+            try:
+                await asyncio.to_thread(
+                    _write_profile, profiler, os.path.join(PROFILING_DIR, filename)
+                )
+            finally:
+                self._profiling = False
@@ -0,0 +1,122 @@
+from collections import Counter
+from typing import Callable, Optional
+import logging
+import os
+
+from app.utils.db_usage import current_db_usage
+
+logger = logging.getLogger(__name__)
+
+# What happens when a request runs more SQL statements than its route's budget:
+# "off" doesn't record statements at all, "log" logs the request's statements
+# and "enforce" also fails the request, for test suites.
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "off").lower()
+# Budget of the routes that don't declare one with `query_budget`
+QUERY_BUDGET_DEFAULT = int(os.getenv("QUERY_BUDGET_DEFAULT", "10"))
+# Number of times the same statement may run in a request before it's reported
+# as a likely N+1 query
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "3"))
+
+QUERY_BUDGET_MODES = ("off", "log", "enforce")
+if QUERY_BUDGET_MODE not in QUERY_BUDGET_MODES:
+    raise ValueError(
+        f"QUERY_BUDGET_MODE must be one of {', '.join(QUERY_BUDGET_MODES)}"
+    )
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised in "enforce" mode when a request runs more SQL statements than its
+    route's budget, or runs the same statement too many times.
+    """
+
+
+def query_budget(statements: Optional[int]):
+    """
+    Declares the maximum number of SQL statements a route may run per request.
+
+    Apply it below the route decorator:
+
+        @router.get("/")
+        @query_budget(2)
+        async def get_all_tasks_by_user(...):
+
+    Parameters:
+    - statements (Optional[int]): The budget, or None for routes whose statement
+      count grows with their input, such as imports.
+
+    Returns:
+    - Callable: A decorator recording the budget on the endpoint function.
+    """
+
+    def decorator(endpoint: Callable):
+        endpoint.__query_budget__ = statements
+        return endpoint
+
+    return decorator
+
+
+def check_statements(route: str, budget: Optional[int], statements: list) -> list:
+    """
+    Checks the statements a request ran against its route's budget and looks
+    for statements repeated often enough to be an N+1 query.
+
+    Parameters:
+    - route (str): The route that served the request, for the report.
+    - budget (Optional[int]): The route's budget, or None for no budget.
+    - statements (list): The SQL of the statements the request ran, in order.
+
+    Returns:
+    - List[str]: The problems found, empty when the request is within budget.
+    """
+    problems = []
+    if budget is not None and len(statements) > budget:
+        problems.append(
+            f"{route} ran {len(statements)} SQL statements, over its budget of {budget}"
+        )
+    for statement, count in Counter(statements).items():
+        if count >= QUERY_REPEAT_THRESHOLD:
+            problems.append(
+                f"{route} ran the same statement {count} times: {statement}"
+            )
+    return problems
+
+
+class QueryBudgetMiddleware:
+    """
+    ASGI middleware recording the SQL statements of every HTTP request and
+    checking them against the budget of the route that served it.
+
+    Budgets are declared on endpoints with `query_budget`; other routes get
+    QUERY_BUDGET_DEFAULT. Statements are recorded on the request's DBUsage
+    record, so the middleware must run inside `DBUsageMiddleware`. In "off"
+    mode it does nothing.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        usage = current_db_usage()
+        if QUERY_BUDGET_MODE == "off" or scope["type"] != "http" or usage is None:
+            await self.app(scope, receive, send)
+            return
+
+        usage.statement_log = []
+        await self.app(scope, receive, send)
+
+        endpoint = scope.get("endpoint")
+        budget = getattr(endpoint, "__query_budget__", QUERY_BUDGET_DEFAULT)
+        route = (
+            f'{scope["method"]} {getattr(scope.get("route"), "path", scope["path"])}'
+        )
+        problems = check_statements(route, budget, usage.statement_log)
+        if not problems:
+            return
+        for problem in problems:
+            logger.warning(problem)
+        if QUERY_BUDGET_MODE == "enforce":
+            statements = "\n".join(usage.statement_log)
+            raise QueryBudgetExceeded(
+                "\n".join(problems) + f"\nStatements run:\n{statements}"
+            )
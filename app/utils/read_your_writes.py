@@ -0,0 +1,58 @@
+from typing import Dict, Optional
+from uuid import UUID
+import os
+import time
+
+# Seconds a user's reads stay on the primary after they wrote, covering the
+# replication lag of the read replicas
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+
+class ReadYourWrites:
+    """
+    Remembers which users wrote recently, so their reads can be served by the
+    primary database until the replicas have caught up with their writes.
+
+    The pins are kept per worker process: with several workers, a user's next
+    request only sees their pin if it's served by the worker that handled the
+    write, so the guarantee needs requests to be routed to workers by user.
+
+    Attributes:
+    - window (float): The number of seconds a user stays pinned after a write.
+    """
+
+    def __init__(self, window: float = READ_YOUR_WRITES_SECONDS):
+        self.window = window
+        self._pins: Dict[UUID, float] = {}
+
+    def pin(self, user_id: UUID):
+        """
+        Pins a user's reads to the primary for the next `window` seconds.
+
+        Parameters:
+        - user_id (UUID): The ID of the user who wrote.
+        """
+        now = time.monotonic()
+        if len(self._pins) > 10000:
+            self._pins = {
+                pinned: until for pinned, until in self._pins.items() if until > now
+            }
+        self._pins[user_id] = now + self.window
+
+    def is_pinned(self, user_id: Optional[UUID]) -> bool:
+        """
+        Checks whether a user's reads must be served by the primary.
+
+        Parameters:
+        - user_id (Optional[UUID]): The ID of the user, if known.
+
+        Returns:
+        - bool: True if the user wrote within the last `window` seconds.
+        """
+        if user_id is None:
+            return False
+        until = self._pins.get(user_id)
+        return until is not None and until > time.monotonic()
+
+
+read_your_writes = ReadYourWrites()
@@ -0,0 +1,74 @@
+import time
+
+from app.utils.db_usage import current_db_usage
+from app.utils.metrics import Counter, Histogram
+
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Time spent serving an HTTP request, until its response is complete.",
+    labelnames=("method", "route"),
+)
+http_requests_total = Counter(
+    "http_requests_total",
+    "HTTP requests served, by response status.",
+    labelnames=("method", "route", "status"),
+)
+db_statements_per_request = Histogram(
+    "db_statements_per_request",
+    "SQL statements executed while serving an HTTP request.",
+    labelnames=("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+db_statement_seconds_per_request = Histogram(
+    "db_statement_seconds_per_request",
+    "Time spent executing SQL statements while serving an HTTP request.",
+    labelnames=("method", "route"),
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency, status and SQL statements of every
+    HTTP request, by method and route.
+
+    Requests are labelled with the path template of the route that served them
+    (e.g. "/tasks/{task_id}"), or "unmatched" when no route did, so the number
+    of series stays bounded. Statements are read from the request's DBUsage
+    record, so the middleware must run inside `DBUsageMiddleware`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            http_request_duration_seconds.labels(method=method, route=route).observe(
+                elapsed
+            )
+            http_requests_total.labels(method=method, route=route, status=status).inc()
+            usage = current_db_usage()
+            if usage is not None:
+                db_statements_per_request.labels(method=method, route=route).observe(
+                    usage.statements
+                )
+                db_statement_seconds_per_request.labels(
+                    method=method, route=route
+                ).observe(usage.statement_seconds)
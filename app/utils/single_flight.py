@@ -0,0 +1,122 @@
+from typing import Awaitable, Callable, Dict, Hashable
+import asyncio
+
+from app.utils.metrics import Counter
+
+single_flight_calls_total = Counter(
+    "single_flight_calls_total",
+    "Reads that ran their own query, as opposed to joining an identical one.",
+    labelnames=("operation",),
+)
+single_flight_coalesced_total = Counter(
+    "single_flight_coalesced_total",
+    "Reads that shared the result of an identical read already in flight, "
+    "saving a query.",
+    labelnames=("operation",),
+)
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent reads: while a read is in flight, callers
+    asking for the same key wait for its result instead of running it again.
+
+    Keys are grouped, typically by user, so that a write can `forget` a group:
+    reads started after it then run on their own rather than joining a read
+    that may have started before the write. Callers that already joined keep
+    the result of the read they joined.
+
+    If the leading caller is cancelled, the callers waiting on it run the read
+    themselves; if it fails, they get its exception.
+
+    Attributes:
+    - enabled (bool): Whether reads are coalesced at all.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._flights: Dict[Hashable, Dict[Hashable, asyncio.Future]] = {}
+
+    async def do(
+        self,
+        group: Hashable,
+        operation: str,
+        key: Hashable,
+        read: Callable[[], Awaitable],
+    ):
+        """
+        Runs a read, or joins the identical read already in flight.
+
+        Parameters:
+        - group (Hashable): The group of the read, e.g. the ID of its user.
+        - operation (str): The name of the read, used in the key and as a metric label.
+        - key (Hashable): The parameters of the read.
+        - read (Callable[[], Awaitable]): Runs the read.
+
+        Returns:
+        - The result of the read.
+        """
+        if not self.enabled:
+            return await read()
+        flights = self._flights.setdefault(group, {})
+        future = flights.get((operation, key))
+        if future is not None:
+            single_flight_coalesced_total.labels(operation=operation).inc()
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+            single_flight_calls_total.labels(operation=operation).inc()
+            return await read()
+
+        single_flight_calls_total.labels(operation=operation).inc()
+        future = asyncio.get_running_loop().create_future()
+        flights[(operation, key)] = future
+        try:
+            result = await read()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Marks the exception as retrieved when nobody joined the read
+            future.exception()
+            raise
+        finally:
+            if flights.get((operation, key)) is future:
+                del flights[(operation, key)]
+            if not flights and self._flights.get(group) is flights:
+                del self._flights[group]
+        future.set_result(result)
+        return result
+
+    def forget(self, group: Hashable):
+        """
+        Stops later reads of a group from joining the reads in flight, e.g.
+        because the group's data was just written.
+
+        Parameters:
+        - group (Hashable): The group whose reads in flight are forgotten.
+        """
+        self._flights.pop(group, None)
+
+    def stats(self) -> dict:
+        """
+        Reports how many reads were coalesced.
+
+        Returns:
+        - dict: Whether coalescing is enabled, the reads that queried and the
+          reads that joined another one, by operation.
+        """
+        return {
+            "enabled": self.enabled,
+            "calls": {
+                labels["operation"]: child.value
+                for labels, child in single_flight_calls_total.series()
+            },
+            "coalesced": {
+                labels["operation"]: child.value
+                for labels, child in single_flight_coalesced_total.series()
+            },
+        }
@@ -0,0 +1,131 @@
+"""
+Compares the concurrent-request throughput of the blocking database path the
+task routes used to take against the async session path.
+
+Both variants serve "list the user's tasks" from the same SQLite database file.
+The only difference is how the session is driven:
+
+- sync: an ``async def`` route calling a blocking ``Session`` (the old behavior),
+  which stalls the event loop for as long as every query runs.
+- async: an ``async def`` route awaiting ``tasks_crud`` on an ``AsyncSession``.
+
+``--query-latency-ms`` adds server-side latency to every request (through a
+``sleep_ms`` SQL function) to emulate a database reached over the network.
+
+Usage:
+    python -m benchmarks.async_db --requests 500 --concurrency 50
+"""
+
+from typing import List
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import tasks_crud
+from app.models import task_model
+from app.schemas import task_schema
+from benchmarks.common import add_sleep_function, percentile, seed
+
+
+def build_app(path: str, user_id: uuid.UUID, latency_ms: int):
+    sync_engine = create_engine(f"sqlite:///{path}")
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    add_sleep_function(sync_engine)
+    add_sleep_function(async_engine.sync_engine)
+    SyncSession = sessionmaker(bind=sync_engine)
+    AsyncSession = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+    latency = text("SELECT sleep_ms(:ms)")
+
+    app = FastAPI()
+
+    # Both variants render the same response model, as the task routes do
+    @app.get("/sync", response_model=List[task_schema.Task])
+    async def sync_tasks():
+        with SyncSession() as db:
+            db.execute(latency, {"ms": latency_ms})
+            return (
+                db.execute(
+                    select(task_model.Task).where(task_model.Task.user_id == user_id)
+                )
+                .scalars()
+                .all()
+            )
+
+    @app.get("/async", response_model=List[task_schema.Task])
+    async def async_tasks():
+        async with AsyncSession() as db:
+            await db.execute(latency, {"ms": latency_ms})
+            return await tasks_crud.get_tasks_by_user(db=db, user_id=user_id)
+
+    return app, (sync_engine, async_engine)
+
+
+async def run(app: FastAPI, path: str, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "throughput": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+    }
+
+
+async def compare(path: str, user_id: uuid.UUID, args):
+    app, (sync_engine, async_engine) = build_app(path, user_id, args.query_latency_ms)
+    try:
+        for mode in ("sync", "async"):
+            result = await run(app, f"/{mode}", args.requests, args.concurrency)
+            print(
+                f"{mode:>5}: {result['throughput']:8.1f} req/s  "
+                f"p50 {result['p50_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms"
+            )
+    finally:
+        sync_engine.dispose()
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Sync vs async database path throughput."
+    )
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--query-latency-ms", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        user_id = seed(create_engine(f"sqlite:///{path}"), args.tasks)
+        asyncio.run(compare(path, user_id, args))
+
+
+if __name__ == "__main__":
+    main()
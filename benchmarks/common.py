@@ -0,0 +1,69 @@
+"""
+Helpers shared by the benchmarks: seeding a throwaway database and emulating
+database latency.
+"""
+
+import datetime
+import time
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.dependencies import Base
+from app.models import task_model, user_model
+
+
+def _sleep_ms(ms):
+    time.sleep(ms / 1000)
+    return ms
+
+
+def _register_sleep_function(dbapi_connection, connection_record):
+    dbapi_connection.create_function("sleep_ms", 1, _sleep_ms)
+
+
+def add_sleep_function(engine):
+    """
+    Registers a `sleep_ms(ms)` SQL function on every connection of a SQLite
+    engine, so benchmarks can emulate the latency of a networked database. The
+    sleep runs in the database driver, like a real round trip would.
+    """
+    event.listen(engine, "connect", _register_sleep_function)
+
+
+def seed(engine, tasks: int, email: str = "bench@example.com"):
+    """
+    Creates the schema on a sync engine and adds a user owning `tasks` tasks.
+
+    Returns the ID of the user.
+    """
+    Base.metadata.create_all(bind=engine)
+    user_id = uuid.uuid4()
+    today = datetime.date.today()
+    with sessionmaker(bind=engine)() as db:
+        db.add(user_model.User(id=user_id, name="bench", email=email))
+        db.add_all(
+            task_model.Task(
+                title=f"Task {i}",
+                description="Benchmark task",
+                created_date=today,
+                due_date=today + datetime.timedelta(days=i % 365),
+                user_id=user_id,
+            )
+            for i in range(tasks)
+        )
+        db.commit()
+    return user_id
+
+
+def percentile(sorted_values, fraction: float):
+    """
+    Returns the value at `fraction` (0-1) of an ascending list.
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(
+        len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
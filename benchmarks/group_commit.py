@@ -0,0 +1,164 @@
+"""
+Compares task creates and deletes committed one transaction per request
+against group commit through the write batcher.
+
+``POST /tasks/`` and then ``DELETE /tasks/{task_id}`` are sent ``--requests``
+times each, ``--concurrency`` at a time, spread over ``--users`` users, with
+``write_batcher`` disabled and then enabled. Every run reports requests/sec
+next to database commits/sec: without batching there is one commit per
+request, with it one per batch.
+
+SQLite's default ``synchronous=FULL`` makes every commit wait for fsync, as
+it would on a durable database. Load shedding and the per-user in-flight
+limit are turned off, so every request reaches the database; deletes are
+only sent for tasks that were created, and the others are reported as
+skipped.
+
+Usage:
+    python -m benchmarks.group_commit --requests 2000 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import datetime
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+import httpx
+from sqlalchemy import event, insert
+
+from app import dependencies
+from app.dependencies import Base
+from app.main import create_app
+from app.models import user_model
+from app.services.users_service import generate_token
+from app.services.write_batcher import write_batcher
+from app.utils import load_shedding
+from benchmarks.common import percentile
+
+
+async def seed_users(url: str, users: int):
+    engine = dependencies.create_engine(url)
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            rows = [
+                {"id": uuid.uuid4(), "name": "bench", "email": f"bench-{n}@example.com"}
+                for n in range(users)
+            ]
+            await connection.execute(insert(user_model.User), rows)
+    finally:
+        await engine.dispose()
+    return [
+        {
+            "Authorization": "Bearer "
+            + generate_token(
+                user_model.User(id=row["id"], email=row["email"])
+            ).access_token
+        }
+        for row in rows
+    ]
+
+
+async def drive(client, headers, requests: int, concurrency: int, request):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+    skipped = 0
+
+    async def one(i):
+        nonlocal errors, skipped
+        async with semaphore:
+            start = time.perf_counter()
+            response = await request(client, headers[i % len(headers)], i)
+            if response is None:
+                skipped += 1
+                return
+            if not response.is_success:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    latencies.sort()
+    return time.perf_counter() - start, latencies, errors, skipped
+
+
+async def run(url: str, headers, args, batching: bool):
+    write_batcher.enabled = batching
+    write_batcher.max_size = args.max_batch
+    write_batcher.max_wait = args.max_wait_ms / 1000
+    app = create_app(url)
+    commits = 0
+    created = [[] for _ in headers]
+    due_date = datetime.date.today().isoformat()
+
+    async def create(client, user_headers, i):
+        response = await client.post(
+            "/tasks/",
+            json={"title": f"Task {i}", "description": "bench", "due_date": due_date},
+            headers=user_headers,
+        )
+        if response.status_code == 200:
+            created[i % len(headers)].append(response.json()["id"])
+        return response
+
+    async def delete(client, user_headers, i):
+        if not created[i % len(headers)]:
+            return None
+        return await client.delete(
+            f"/tasks/{created[i % len(headers)].pop()}", headers=user_headers
+        )
+
+    async with app.router.lifespan_context(app):
+
+        @event.listens_for(dependencies.engine.sync_engine, "commit")
+        def count_commit(connection):
+            nonlocal commits
+            commits += 1
+
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+            base_url="http://bench",
+        ) as client:
+            for name, request in (("create", create), ("delete", delete)):
+                commits = 0
+                elapsed, latencies, errors, skipped = await drive(
+                    client, headers, args.requests, args.concurrency, request
+                )
+                sent = len(latencies)
+                label = "batched" if batching else "per-request"
+                print(
+                    f"{label:>11} {name}: {sent / elapsed:8.1f} req/s  "
+                    f"{commits / elapsed:8.1f} commits/s  "
+                    f"{sent / commits if commits else 0:5.1f} writes/commit  "
+                    f"p50 {statistics.median(latencies) * 1000 if sent else 0:6.1f} ms  "
+                    f"p95 {percentile(latencies, 0.95) * 1000 if sent else 0:6.1f} ms  "
+                    f"errors {errors}  skipped {skipped}"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request vs group commit.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--max-batch", type=int, default=100)
+    parser.add_argument("--max-wait-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    load_shedding.LOAD_SHED_MAX_POOL_WAITING = 0
+    load_shedding.LOAD_SHED_MAX_IN_FLIGHT = 0
+    load_shedding.USER_MAX_IN_FLIGHT = 0
+    for batching in (False, True):
+        with tempfile.TemporaryDirectory() as directory:
+            url = "sqlite:///" + os.path.join(directory, "bench.db")
+            headers = asyncio.run(seed_users(url, args.users))
+            asyncio.run(run(url, headers, args, batching))
+
+
+if __name__ == "__main__":
+    main()
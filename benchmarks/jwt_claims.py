@@ -0,0 +1,93 @@
+"""
+Measures the database round trip saved on every task request by reading the
+user ID from the JWT claims instead of resolving the user by email first.
+
+- email: the old path, `users_service.get_user` by the token's email and then
+  the task query with the user's ID.
+- claims: the task query with the user ID taken straight from the token.
+
+``--round-trip-ms`` adds latency to every statement to emulate a database
+reached over the network; requests run one at a time so it adds up per request.
+The task list cache is turned off, so every request queries the tasks and the
+comparison isolates the user lookup.
+
+Usage:
+    python -m benchmarks.jwt_claims --requests 200 --round-trip-ms 1
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.services import tasks_service, users_service
+from app.services.task_cache import task_list_cache
+from benchmarks.common import seed
+
+EMAIL = "bench@example.com"
+
+
+async def email_path(db, user_id, limit):
+    user = await users_service.get_user(db=db, email=EMAIL)
+    return await tasks_service.get_all_tasks_by_user(
+        db=db, user_id=user.id, limit=limit
+    )
+
+
+async def claims_path(db, user_id, limit):
+    return await tasks_service.get_all_tasks_by_user(
+        db=db, user_id=user_id, limit=limit
+    )
+
+
+async def compare(path: str, user_id, args):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    SessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
+    statements = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_statement(*_):
+        nonlocal statements
+        statements += 1
+        if args.round_trip_ms:
+            time.sleep(args.round_trip_ms / 1000)
+
+    try:
+        for name, handler in (("email", email_path), ("claims", claims_path)):
+            statements = 0
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                async with SessionLocal() as db:
+                    await handler(db, user_id, args.limit)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{name:>6}: {statements / args.requests:4.1f} statements/request  "
+                f"{elapsed / args.requests * 1000:7.2f} ms/request"
+            )
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Email lookup vs JWT user ID claim.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--round-trip-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    task_list_cache.enabled = False
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        engine = create_engine(f"sqlite:///{path}")
+        user_id = seed(engine, args.tasks, email=EMAIL)
+        engine.dispose()
+        asyncio.run(compare(path, user_id, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+"""
+Load test of the service's routes, reporting latency percentiles and throughput
+per endpoint.
+
+The database (a throwaway SQLite file by default, or ``--database-url``, e.g. a
+local Postgres) is seeded with ``--users`` users owning ``--tasks-per-user``
+tasks each. Every route of ``users_router`` and ``tasks_router`` is then driven
+in turn with ``--requests`` requests, ``--concurrency`` of them in flight at a
+time, spread over the seeded users in a fixed order so runs are comparable.
+
+Requests go to the app in-process through its ASGI interface, so the numbers
+exclude the HTTP server. To measure a running server instead, seed the
+database it uses and pass its URL with ``--base-url``.
+
+Results are written as JSON to ``--output``; passing an earlier result file as
+``--baseline`` prints the change of every endpoint's p95 and throughput.
+
+Usage:
+    python -m benchmarks.load_test --users 20 --tasks-per-user 200 \\
+        --requests 200 --concurrency 20 --output results.json
+    python -m benchmarks.load_test --baseline results.json
+"""
+
+import argparse
+import asyncio
+import csv
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import insert
+
+from app import dependencies
+from app.dependencies import Base
+from app.main import create_app
+from app.models import task_model, user_model
+from app.services.users_service import generate_token
+from app.utils.password_hashing import pwd_context
+from benchmarks.common import percentile
+
+PASSWORD = "benchmark-password"
+BULK_SIZE = 10
+IMPORT_ROWS = 50
+
+
+@dataclass
+class BenchUser:
+    id: uuid.UUID
+    email: str
+    headers: Dict[str, str]
+    task_ids: List[str]
+    created_ids: List[str] = field(default_factory=list)
+    bulk_ids: List[str] = field(default_factory=list)
+
+
+async def seed_database(url: str, users: int, tasks_per_user: int, reset: bool):
+    """
+    Creates the schema and the users and tasks of the benchmark.
+
+    All users share one password, hashed once, so seeding doesn't spend its
+    time in bcrypt.
+    """
+    engine = dependencies.create_engine(url)
+    hashed_password = pwd_context.hash(PASSWORD)
+    today = datetime.date.today()
+    seeded = []
+    try:
+        async with engine.begin() as connection:
+            if reset:
+                await connection.run_sync(Base.metadata.drop_all)
+            await connection.run_sync(Base.metadata.create_all)
+            run = uuid.uuid4().hex[:8]
+            for number in range(users):
+                user = user_model.User(
+                    id=uuid.uuid4(),
+                    name=f"bench {number}",
+                    email=f"bench-{run}-{number}@example.com",
+                )
+                await connection.execute(
+                    insert(user_model.User),
+                    [
+                        {
+                            "id": user.id,
+                            "name": user.name,
+                            "email": user.email,
+                            "hashed_password": hashed_password,
+                        }
+                    ],
+                )
+                tasks = [
+                    {
+                        "id": uuid.uuid4(),
+                        "title": f"Task {i}",
+                        "description": f"Benchmark task number {i}",
+                        "created_date": today - datetime.timedelta(days=i % 30),
+                        "due_date": today + datetime.timedelta(days=i % 60 - 10),
+                        "user_id": user.id,
+                    }
+                    for i in range(tasks_per_user)
+                ]
+                if tasks:
+                    await connection.execute(insert(task_model.Task), tasks)
+                token = generate_token(user).access_token
+                seeded.append(
+                    BenchUser(
+                        id=user.id,
+                        email=user.email,
+                        headers={"Authorization": f"Bearer {token}"},
+                        task_ids=[str(task["id"]) for task in tasks],
+                    )
+                )
+    finally:
+        await engine.dispose()
+    return seeded
+
+
+def task_body(number: int) -> dict:
+    return {
+        "title": f"Load test task {number}",
+        "description": "Created by the load test",
+        "due_date": (
+            datetime.date.today() + datetime.timedelta(days=number % 30)
+        ).isoformat(),
+    }
+
+
+def import_file() -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["title", "description", "due_date"])
+    for number in range(IMPORT_ROWS):
+        body = task_body(number)
+        writer.writerow([body["title"], body["description"], body["due_date"]])
+    return buffer.getvalue().encode()
+
+
+def build_endpoints(users: List[BenchUser]):
+    """
+    Returns the (name, request) pairs driven by the load test, in order. Every
+    request is built from its sequence number; later endpoints update and
+    delete the tasks created by earlier ones.
+    """
+    csv_file = import_file()
+    run = uuid.uuid4().hex[:8]
+
+    def user(i):
+        return users[i % len(users)]
+
+    async def signup(client, i):
+        return await client.post(
+            "/users/signup",
+            json={
+                "name": "signup",
+                "email": f"signup-{run}-{i}@example.com",
+                "password": PASSWORD,
+                "repeat_password": PASSWORD,
+            },
+        )
+
+    async def login(client, i):
+        return await client.post(
+            "/users/login", data={"username": user(i).email, "password": PASSWORD}
+        )
+
+    async def list_tasks(client, i):
+        return await client.get("/tasks/", headers=user(i).headers)
+
+    async def list_tasks_not_modified(client, i):
+        response = await client.get("/tasks/?limit=1", headers=user(i).headers)
+        return await client.get(
+            "/tasks/?limit=1",
+            headers={**user(i).headers, "If-None-Match": response.headers["ETag"]},
+        )
+
+    async def search_tasks(client, i):
+        return await client.get(
+            "/tasks/",
+            params={"q": f"number {i % 100}", "sort": "created_date"},
+            headers=user(i).headers,
+        )
+
+    async def task_stats(client, i):
+        return await client.get("/tasks/stats", headers=user(i).headers)
+
+    async def create_task(client, i):
+        response = await client.post(
+            "/tasks/", json=task_body(i), headers=user(i).headers
+        )
+        if response.status_code == 200:
+            user(i).created_ids.append(response.json()["id"])
+        return response
+
+    async def update_task(client, i):
+        owner = user(i)
+        task_id = owner.task_ids[i // len(users) % len(owner.task_ids)]
+        return await client.put(
+            "/tasks/",
+            json={**task_body(i), "id": task_id, "created_by": str(owner.id)},
+            headers=owner.headers,
+        )
+
+    async def patch_task(client, i):
+        owner = user(i)
+        task_id = owner.task_ids[i // len(users) % len(owner.task_ids)]
+        return await client.patch(
+            f"/tasks/{task_id}",
+            json={"title": task_body(i)["title"]},
+            headers=owner.headers,
+        )
+
+    async def export_tasks(client, i):
+        return await client.get("/tasks/export", headers=user(i).headers)
+
+    async def import_tasks(client, i):
+        return await client.post(
+            "/tasks/import",
+            files={"file": ("tasks.csv", csv_file, "text/csv")},
+            headers=user(i).headers,
+        )
+
+    async def bulk_create(client, i):
+        response = await client.post(
+            "/tasks/bulk",
+            json=[task_body(i * BULK_SIZE + n) for n in range(BULK_SIZE)],
+            headers=user(i).headers,
+        )
+        if response.status_code == 200:
+            user(i).bulk_ids.extend(
+                item["id"] for item in response.json()["results"] if item["id"]
+            )
+        return response
+
+    async def bulk_update(client, i):
+        owner = user(i)
+        start = i // len(users) * BULK_SIZE
+        ids = [
+            owner.task_ids[(start + n) % len(owner.task_ids)] for n in range(BULK_SIZE)
+        ]
+        return await client.put(
+            "/tasks/bulk",
+            json=[{**task_body(i), "id": task_id} for task_id in ids],
+            headers=owner.headers,
+        )
+
+    async def bulk_delete(client, i):
+        owner = user(i)
+        ids, owner.bulk_ids[:BULK_SIZE] = owner.bulk_ids[:BULK_SIZE], []
+        return await client.request(
+            "DELETE",
+            "/tasks/bulk",
+            json=ids or [str(uuid.uuid4())],
+            headers=owner.headers,
+        )
+
+    async def delete_task(client, i):
+        owner = user(i)
+        task_id = owner.created_ids.pop() if owner.created_ids else uuid.uuid4()
+        return await client.delete(f"/tasks/{task_id}", headers=owner.headers)
+
+    endpoints = [
+        ("POST /users/signup", signup),
+        ("POST /users/login", login),
+        ("GET /tasks/", list_tasks),
+        ("GET /tasks/ (304)", list_tasks_not_modified),
+        ("GET /tasks/?q=", search_tasks),
+        ("GET /tasks/stats", task_stats),
+        ("POST /tasks/", create_task),
+        ("PUT /tasks/", update_task),
+        ("PATCH /tasks/{task_id}", patch_task),
+        ("GET /tasks/export", export_tasks),
+        ("POST /tasks/import", import_tasks),
+        ("POST /tasks/bulk", bulk_create),
+        ("PUT /tasks/bulk", bulk_update),
+        ("DELETE /tasks/bulk", bulk_delete),
+        ("DELETE /tasks/{task_id}", delete_task),
+    ]
+    if any(not u.task_ids for u in users):
+        endpoints = [
+            e
+            for e in endpoints
+            if e[0] not in ("PUT /tasks/", "PATCH /tasks/{task_id}", "PUT /tasks/bulk")
+        ]
+    return endpoints
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    request: Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]],
+    requests: int,
+    concurrency: int,
+):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = Counter()
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await request(client, i)
+                statuses[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    errors = sum(
+        count
+        for status, count in statuses.items()
+        if not status.isdigit() or int(status) >= 400
+    )
+    return {
+        "requests": requests,
+        "errors": errors,
+        "statuses": dict(sorted(statuses.items())),
+        "throughput": requests / elapsed,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def run(args, database_url: str):
+    users = await seed_database(
+        database_url, args.users, args.tasks_per_user, args.reset
+    )
+    endpoints = build_endpoints(users)
+    if args.endpoints:
+        endpoints = [e for e in endpoints if any(s in e[0] for s in args.endpoints)]
+    results = {}
+
+    async def drive_all(client):
+        for name, request in endpoints:
+            results[name] = await drive(
+                client, request, args.requests, args.concurrency
+            )
+            result = results[name]
+            print(
+                f"{name:>24}: {result['throughput']:8.1f} req/s  "
+                f"p50 {result['p50_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms  "
+                f"p99 {result['p99_ms']:7.1f} ms  errors {result['errors']}"
+            )
+
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+            await drive_all(client)
+        return results
+    app = create_app(database_url)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            # Server errors are counted like a real server would return them
+            transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+            base_url="http://bench",
+            timeout=60,
+        ) as client:
+            await drive_all(client)
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict):
+    print("\nChange against the baseline:")
+    for name, result in results.items():
+        before = baseline.get("endpoints", {}).get(name)
+        if before is None:
+            continue
+        p95 = (result["p95_ms"] / before["p95_ms"] - 1) * 100 if before["p95_ms"] else 0
+        throughput = (
+            (result["throughput"] / before["throughput"] - 1) * 100
+            if before["throughput"]
+            else 0
+        )
+        print(f"{name:>24}: p95 {p95:+7.1f}%  throughput {throughput:+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-endpoint load test.")
+    parser.add_argument("--database-url", help="Defaults to a throwaway SQLite file.")
+    parser.add_argument("--base-url", help="Drive a running server instead.")
+    parser.add_argument("--reset", action="store_true", help="Drop the tables first.")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--tasks-per-user", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--endpoints", nargs="*", help="Only drive endpoints whose name contains these."
+    )
+    parser.add_argument("--output", default="load_test_results.json")
+    parser.add_argument("--baseline", help="An earlier result file to compare with.")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = args.database_url or "sqlite:///" + os.path.join(
+            directory, "bench.db"
+        )
+        started_at = datetime.datetime.now(datetime.timezone.utc)
+        results = asyncio.run(run(args, database_url))
+
+    report = {
+        "started_at": started_at.isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "database": dependencies.get_async_database_url(database_url).drivername,
+        "target": args.base_url or "in-process",
+        "users": args.users,
+        "tasks_per_user": args.tasks_per_user,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "endpoints": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"\nResults written to {args.output}")
+    if baseline is not None:
+        compare(results, baseline)
+
+
+if __name__ == "__main__":
+    main()
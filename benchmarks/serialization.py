@@ -0,0 +1,73 @@
+"""
+Micro-benchmark of rendering a user's task list as JSON.
+
+- entities + jsonable_encoder: full ORM entities without a response model, the
+  way the task routes used to be rendered.
+- rows + TaskPage: projected rows validated into `task_schema.TaskPage` and
+  dumped by pydantic-core, the path FastAPI takes with a response model.
+- rows + orjson: projected rows dumped by orjson, as a reference (skipped when
+  orjson isn't installed).
+
+Usage:
+    python -m benchmarks.serialization --tasks 10000
+"""
+
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.crud.tasks_crud import TASK_COLUMNS
+from app.models import task_model
+from app.schemas import task_schema
+from benchmarks.common import seed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def best_of(repeat: int, function):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Task list JSON rendering.")
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    seed(engine, args.tasks)
+    with Session(engine) as db:
+        entities = db.scalars(select(task_model.Task)).all()
+        rows = db.execute(select(*TASK_COLUMNS)).all()
+
+        cases = {
+            "entities + jsonable_encoder": lambda: json.dumps(
+                jsonable_encoder(entities)
+            ).encode(),
+            "rows + TaskPage": lambda: task_schema.TaskPage(
+                items=rows
+            ).model_dump_json(),
+        }
+        if orjson is not None:
+            cases["rows + orjson"] = lambda: orjson.dumps(
+                [row._asdict() for row in rows]
+            )
+        for name, case in cases.items():
+            elapsed = best_of(args.repeat, case)
+            print(f"{name:>28}: {elapsed * 1000:8.1f} ms for {len(rows)} tasks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Measures the cold start of a worker: how long a fresh interpreter takes to
+import the app, to run its startup and to answer its first request.
+
+Every run starts a new Python process, as an autoscaled pod or a restarted
+worker would. The process imports ``app.main``, runs the app's lifespan startup
+(engine creation, table creation unless ``DB_CREATE_TABLES=false`` and pool
+pre-warming if ``DB_POOL_PREWARM`` is set) and sends ``GET /health/ready``.
+
+- import: from interpreter start to ``app.main`` being imported.
+- startup: the lifespan startup.
+- first request: the first readiness probe, the first query on the engine.
+- total: from spawning the process to the first response.
+
+Usage:
+    python -m benchmarks.startup --runs 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+async def cold_start():
+    start = time.perf_counter()
+    from app.main import app
+
+    import httpx
+
+    imported = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+            response = await client.get("/health/ready")
+            response.raise_for_status()
+        answered = time.perf_counter()
+    print(
+        json.dumps(
+            {
+                "import": imported - start,
+                "startup": started - imported,
+                "first_request": answered - started,
+            }
+        )
+    )
+
+
+def run_once(database_url: str):
+    environment = {**os.environ, "DATABASE_URL": database_url}
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child"],
+        env=environment,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    result = json.loads(output.splitlines()[-1])
+    result["total"] = time.perf_counter() - start
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker cold start time.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--database-url", help="Defaults to a throwaway SQLite database file."
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(cold_start())
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = args.database_url or "sqlite:///" + os.path.join(
+            directory, "bench.db"
+        )
+        runs = [run_once(database_url) for _ in range(args.runs)]
+
+    # Imported here so the child processes import the app from scratch
+    from benchmarks.common import percentile
+
+    for phase in ("import", "startup", "first_request", "total"):
+        timings = sorted(run[phase] for run in runs)
+        print(
+            f"{phase:>13}: p50 {statistics.median(timings) * 1000:8.1f} ms  "
+            f"p95 {percentile(timings, 0.95) * 1000:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
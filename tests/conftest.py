@@ -0,0 +1,75 @@
+import httpx
+import pytest
+
+from app.main import create_app
+from app.services.task_cache import task_list_cache
+from app.utils import query_budget
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def app(tmp_path, monkeypatch):
+    """
+    The app, serving a fresh SQLite database, with query budgets enforced so
+    every request of a test fails when its route runs more statements than
+    declared.
+    """
+    monkeypatch.setattr(query_budget, "QUERY_BUDGET_MODE", "enforce")
+    application = create_app(f"sqlite:///{tmp_path / 'tasks.db'}")
+    async with application.router.lifespan_context(application):
+        yield application
+
+
+@pytest.fixture
+async def client(app):
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+
+
+@pytest.fixture
+def no_task_cache(monkeypatch):
+    """
+    Disables the task list cache, so every read of a test reaches the database.
+    """
+    monkeypatch.setattr(task_list_cache, "enabled", False)
+
+
+async def sign_up(client: httpx.AsyncClient, email: str = "user@example.com") -> dict:
+    """
+    Signs a user up and logs them in.
+
+    Returns:
+    - dict: The Authorization header of the user.
+    """
+    password = "Passw0rd!"
+    response = await client.post(
+        "/users/signup",
+        json={
+            "name": "User",
+            "email": email,
+            "password": password,
+            "repeat_password": password,
+        },
+    )
+    assert response.status_code == 200, response.text
+    response = await client.post(
+        "/users/login", data={"username": email, "password": password}
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def create_task(client: httpx.AsyncClient, headers: dict, title: str = "Task"):
+    response = await client.post(
+        "/tasks/",
+        json={"title": title, "description": "Description", "due_date": "2030-01-01"},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
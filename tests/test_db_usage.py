@@ -0,0 +1,28 @@
+import pytest
+
+from app.utils import db_usage
+from tests.conftest import create_task, sign_up
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_responses_report_the_statements_of_their_request(
+    client, no_task_cache, monkeypatch
+):
+    monkeypatch.setattr(db_usage, "DB_USAGE_HEADERS", True)
+    headers = await sign_up(client)
+    await create_task(client, headers)
+
+    response = await client.get("/tasks/", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["X-DB-Sessions"] == "1"
+    assert response.headers["X-DB-Statements"] == "2"
+
+
+async def test_usage_headers_are_only_sent_when_enabled(client, monkeypatch):
+    monkeypatch.setattr(db_usage, "DB_USAGE_HEADERS", False)
+
+    response = await client.get("/health")
+
+    assert "X-DB-Statements" not in response.headers
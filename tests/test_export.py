@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+
+import pytest
+from sqlalchemy import update
+
+from app import dependencies
+from app.models.user_model import User
+from tests.conftest import create_task, sign_up
+
+pytestmark = pytest.mark.anyio
+
+
+async def make_admin(email: str):
+    async with dependencies.engine.begin() as connection:
+        await connection.execute(
+            update(User).where(User.email == email).values(is_admin=True)
+        )
+
+
+async def test_export_streams_the_users_tasks_as_ndjson(client):
+    headers = await sign_up(client)
+    tasks = [await create_task(client, headers, title=f"Task {i}") for i in range(3)]
+    other = await sign_up(client, email="other@example.com")
+    await create_task(client, other, title="Not mine")
+
+    response = await client.get("/tasks/export", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/x-ndjson"
+    assert (
+        response.headers["Content-Disposition"] == 'attachment; filename="tasks.ndjson"'
+    )
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(exported, key=lambda task: task["title"]) == tasks
+
+
+async def test_export_streams_the_users_tasks_as_csv(client):
+    headers = await sign_up(client)
+    task = await create_task(client, headers, title='Comma, and "quotes"')
+
+    response = await client.get(
+        "/tasks/export", params={"format": "csv"}, headers=headers
+    )
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/csv")
+    assert list(csv.DictReader(io.StringIO(response.text))) == [
+        {key: str(value) for key, value in task.items()}
+    ]
+
+
+async def test_an_empty_csv_export_still_has_its_header(client):
+    headers = await sign_up(client)
+
+    response = await client.get(
+        "/tasks/export", params={"format": "csv"}, headers=headers
+    )
+
+    assert response.text.splitlines() == [
+        "id,title,description,due_date,created_date,created_by"
+    ]
+
+
+async def test_admins_can_export_every_users_tasks(client):
+    admin = await sign_up(client, email="admin@example.com")
+    other = await sign_up(client, email="other@example.com")
+    await create_task(client, admin, title="Admin's")
+    await create_task(client, other, title="Other's")
+    await make_admin("admin@example.com")
+
+    response = await client.get("/tasks/export", params={"scope": "all"}, headers=admin)
+
+    assert response.status_code == 200
+    titles = sorted(json.loads(line)["title"] for line in response.text.splitlines())
+    assert titles == ["Admin's", "Other's"]
+
+
+async def test_only_admins_can_export_every_users_tasks(client):
+    headers = await sign_up(client)
+    await create_task(client, headers)
+
+    response = await client.get(
+        "/tasks/export", params={"scope": "all"}, headers=headers
+    )
+
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Only admins can export every user's tasks"
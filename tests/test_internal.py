@@ -0,0 +1,22 @@
+import pytest
+from sqlalchemy import update
+
+from app import dependencies
+from app.models.user_model import User
+from tests.conftest import sign_up
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("path", ["/internal/pool", "/internal/cache"])
+async def test_internal_endpoints_require_an_admin(client, path):
+    headers = await sign_up(client)
+
+    assert (await client.get(path)).status_code == 401
+    assert (await client.get(path, headers=headers)).status_code == 403
+
+    async with dependencies.engine.begin() as connection:
+        await connection.execute(
+            update(User).where(User.email == "user@example.com").values(is_admin=True)
+        )
+    assert (await client.get(path, headers=headers)).status_code == 200
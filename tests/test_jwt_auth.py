@@ -0,0 +1,59 @@
+from datetime import timedelta
+import asyncio
+import time
+import uuid
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from app.utils import jwt_auth
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def token_cache(monkeypatch):
+    cache = jwt_auth.TokenCache(max_size=10)
+    monkeypatch.setattr(jwt_auth, "token_cache", cache)
+    return cache
+
+
+def claims() -> dict:
+    return {"sub": "user@example.com", "uid": str(uuid.uuid4())}
+
+
+async def test_a_cached_token_is_rejected_once_it_expires(token_cache):
+    token = jwt_auth.create_access_token(claims(), timedelta(seconds=2))
+    expires_at = jwt.decode(token, options={"verify_signature": False})["exp"]
+
+    assert (await jwt_auth.get_current_user(token)).email == "user@example.com"
+    assert len(token_cache) == 1
+    await asyncio.sleep(expires_at - time.time() + 0.1)
+
+    with pytest.raises(HTTPException) as error:
+        await jwt_auth.get_current_user(token)
+    assert error.value.status_code == 401
+    assert len(token_cache) == 0
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        jwt.encode(
+            {**claims(), "ver": jwt_auth.TOKEN_VERSION, "exp": time.time() + 600},
+            "another-secret-key-of-at-least-32-bytes",
+            algorithm=jwt_auth.ALGORITHM,
+        ),
+        jwt_auth.create_access_token(claims())[:-4] + "AAAA",
+    ],
+    ids=["other-key", "tampered"],
+)
+async def test_a_token_with_a_bad_signature_is_never_cached(token_cache, token):
+    for _ in range(2):
+        with pytest.raises(HTTPException) as error:
+            await jwt_auth.get_current_user(token)
+        assert error.value.status_code == 401
+
+    assert len(token_cache) == 0
+    assert token_cache.get(token) is None
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+from app.utils import load_shedding
+from tests.conftest import sign_up
+
+pytestmark = pytest.mark.anyio
+
+ORIGIN = {"Origin": "http://localhost:3000"}
+
+
+async def test_shed_requests_get_503_with_cors_headers(client, monkeypatch):
+    monkeypatch.setattr(load_shedding, "LOAD_SHED_MAX_IN_FLIGHT", 1)
+    monkeypatch.setattr(load_shedding, "_pool_waiting", lambda: 0)
+    headers = await sign_up(client)
+
+    responses = await asyncio.gather(
+        *(client.get("/tasks/", headers={**headers, **ORIGIN}) for _ in range(5))
+    )
+
+    shed = [response for response in responses if response.status_code == 503]
+    assert shed
+    for response in shed:
+        assert response.headers["Retry-After"] == "1"
+        assert response.headers["Access-Control-Allow-Origin"] == ORIGIN["Origin"]
+
+
+async def test_users_over_their_in_flight_limit_get_429(client, monkeypatch):
+    monkeypatch.setattr(load_shedding, "USER_MAX_IN_FLIGHT", 1)
+    headers = await sign_up(client)
+
+    responses = await asyncio.gather(
+        *(client.get("/tasks/", headers={**headers, **ORIGIN}) for _ in range(5))
+    )
+
+    statuses = [response.status_code for response in responses]
+    assert 200 in statuses and 429 in statuses
+    assert load_shedding._user_in_flight == {}
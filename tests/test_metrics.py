@@ -0,0 +1,34 @@
+import httpx
+import pytest
+
+from app.main import create_app
+from app.routers import metrics_router
+
+pytestmark = pytest.mark.anyio
+
+
+def client_for(app):
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    )
+
+
+async def test_metrics_are_not_served_unless_enabled(monkeypatch):
+    monkeypatch.setattr(metrics_router, "METRICS_ENABLED", False)
+
+    async with client_for(create_app()) as client:
+        assert (await client.get("/metrics")).status_code == 404
+
+
+async def test_metrics_require_the_token_when_set(monkeypatch):
+    monkeypatch.setattr(metrics_router, "METRICS_ENABLED", True)
+    monkeypatch.setattr(metrics_router, "METRICS_TOKEN", "secret")
+
+    async with client_for(create_app()) as client:
+        assert (await client.get("/metrics")).status_code == 401
+        response = await client.get(
+            "/metrics", headers={"Authorization": "Bearer secret"}
+        )
+
+    assert response.status_code == 200
+    assert "http_requests_total" in response.text
@@ -0,0 +1,88 @@
+import base64
+
+import pytest
+
+from app.utils.pagination import encode_cursor
+from tests.conftest import sign_up
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_tasks(client, headers, count: int):
+    response = await client.post(
+        "/tasks/bulk",
+        json=[
+            {"title": f"Task {i}", "description": "", "due_date": f"2030-01-{i + 1:02}"}
+            for i in range(count)
+        ],
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+
+
+async def test_pages_walk_every_task_once_in_order(client):
+    headers = await sign_up(client)
+    await create_tasks(client, headers, 5)
+    titles, cursor, pages = [], None, 0
+
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/tasks/", params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        titles.extend(task["title"] for task in page["items"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert titles == [f"Task {i}" for i in range(5)]
+    assert pages == 3
+
+
+async def test_the_last_page_has_no_next_cursor(client):
+    headers = await sign_up(client)
+    await create_tasks(client, headers, 2)
+
+    response = await client.get("/tasks/", params={"limit": 2}, headers=headers)
+
+    assert len(response.json()["items"]) == 2
+    assert response.json()["next_cursor"] is None
+
+
+async def test_a_cursor_of_another_sort_order_is_rejected(client):
+    headers = await sign_up(client)
+    await create_tasks(client, headers, 3)
+    page = (await client.get("/tasks/", params={"limit": 1}, headers=headers)).json()
+
+    response = await client.get(
+        "/tasks/",
+        params={"cursor": page["next_cursor"], "sort": "created_date"},
+        headers=headers,
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "The cursor is invalid"
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "garbage!",
+        base64.urlsafe_b64encode(b"{}").decode(),
+        encode_cursor(["due_date", "2020-01-01"]),
+        encode_cursor(["due_date", "2020-01-01", 5]),
+        encode_cursor(["due_date", 20200101, "00000000-0000-0000-0000-000000000000"]),
+        encode_cursor(["due_date", "2020-01-01", "not-a-uuid"]),
+        encode_cursor(
+            ["due_date", "yesterday", "00000000-0000-0000-0000-000000000000"]
+        ),
+    ],
+)
+async def test_a_tampered_cursor_is_rejected(client, cursor):
+    headers = await sign_up(client)
+
+    response = await client.get("/tasks/", params={"cursor": cursor}, headers=headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "The cursor is invalid"
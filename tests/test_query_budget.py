@@ -0,0 +1,73 @@
+import uuid
+
+import pytest
+
+from app.utils.query_budget import check_statements
+from tests.conftest import create_task, sign_up
+
+pytestmark = pytest.mark.anyio
+
+
+def test_check_statements_reports_budget_overruns():
+    problems = check_statements("GET /tasks/", 2, ["SELECT 1", "SELECT 2", "SELECT 3"])
+
+    assert problems == ["GET /tasks/ ran 3 SQL statements, over its budget of 2"]
+
+
+def test_check_statements_reports_repeated_statements():
+    problems = check_statements("GET /tasks/", None, ["SELECT 1"] * 3)
+
+    assert problems == ["GET /tasks/ ran the same statement 3 times: SELECT 1"]
+
+
+def test_check_statements_accepts_requests_within_budget():
+    assert check_statements("GET /tasks/", 2, ["SELECT 1", "SELECT 2"]) == []
+
+
+async def test_task_routes_stay_within_their_budgets(client, no_task_cache):
+    # The app runs with QUERY_BUDGET_MODE=enforce: a route running more
+    # statements than its budget raises QueryBudgetExceeded here
+    headers = await sign_up(client)
+    task = await create_task(client, headers)
+    other = await create_task(client, headers, title="Other")
+    task_id = task["id"]
+
+    responses = [
+        await client.get("/tasks/", headers=headers),
+        await client.get("/tasks/", params={"q": "task"}, headers=headers),
+        await client.get("/tasks/stats", headers=headers),
+        await client.get("/tasks/export", headers=headers),
+        await client.put("/tasks/", json={**task, "title": "Put"}, headers=headers),
+        await client.patch(
+            f"/tasks/{task_id}", json={"title": "Patched"}, headers=headers
+        ),
+        await client.post(
+            "/tasks/bulk",
+            json=[
+                {"title": "Bulk", "description": "", "due_date": "2030-01-01"},
+                {"title": "Bulk", "description": "", "due_date": "2030-01-02"},
+            ],
+            headers=headers,
+        ),
+        await client.put(
+            "/tasks/bulk",
+            json=[
+                {**task, "title": "Bulk put"},
+                {**other, "due_date": "2031-01-01"},
+                {
+                    "id": str(uuid.uuid4()),
+                    "title": "Missing",
+                    "description": "",
+                    "due_date": "2030-01-01",
+                },
+            ],
+            headers=headers,
+        ),
+        await client.request(
+            "DELETE", "/tasks/bulk", json=[str(uuid.uuid4())], headers=headers
+        ),
+        await client.delete(f"/tasks/{task_id}", headers=headers),
+        await client.delete(f"/tasks/{task_id}", headers=headers),
+    ]
+
+    assert [response.status_code for response in responses] == [200] * 10 + [404]
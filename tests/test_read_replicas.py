@@ -0,0 +1,70 @@
+import datetime
+import uuid
+
+import httpx
+import pytest
+from sqlalchemy import insert, select
+
+from app import dependencies
+from app.main import create_app
+from app.models.task_model import Task
+from app.utils import query_budget
+from app.utils.read_your_writes import read_your_writes
+from tests.conftest import create_task, sign_up
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def client(tmp_path, monkeypatch, no_task_cache):
+    """
+    A client of the app serving a primary SQLite database, with a second SQLite
+    file standing in for its read replica.
+    """
+    monkeypatch.setattr(query_budget, "QUERY_BUDGET_MODE", "enforce")
+    monkeypatch.setenv("DATABASE_REPLICA_URLS", f"sqlite:///{tmp_path / 'replica.db'}")
+    application = create_app(f"sqlite:///{tmp_path / 'primary.db'}")
+    async with application.router.lifespan_context(application):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=application), base_url="http://test"
+        ) as client:
+            yield client
+
+
+async def titles(async_engine) -> list:
+    async with async_engine.connect() as connection:
+        return list(await connection.scalars(select(Task.title).order_by(Task.title)))
+
+
+async def list_titles(client, headers) -> list:
+    response = await client.get("/tasks/", headers=headers)
+    assert response.status_code == 200, response.text
+    return sorted(task["title"] for task in response.json()["items"])
+
+
+async def test_reads_go_to_the_replica_unless_the_user_just_wrote(client):
+    headers = await sign_up(client)
+    task = await create_task(client, headers, title="Primary")
+    [replica] = dependencies.replica_engines
+    async with replica.begin() as connection:
+        await connection.execute(
+            insert(Task).values(
+                id=uuid.uuid4(),
+                title="Replica",
+                description="",
+                created_date=datetime.date.today(),
+                user_id=uuid.UUID(task["created_by"]),
+                due_date=datetime.date(2030, 1, 1),
+            )
+        )
+
+    # The write pinned the user to the primary
+    assert await list_titles(client, headers) == ["Primary"]
+    read_your_writes._pins.clear()
+    assert await list_titles(client, headers) == ["Replica"]
+
+    await create_task(client, headers, title="Second")
+
+    assert await titles(dependencies.engine) == ["Primary", "Second"]
+    assert await titles(replica) == ["Replica"]
+    assert await list_titles(client, headers) == ["Primary", "Second"]
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+import app.services.tasks_service as tasks_service
+from app.services.task_cache import task_read_flights
+from app.utils import load_shedding
+from app.utils.single_flight import SingleFlight
+from tests.conftest import create_task, sign_up
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_identical_reads_share_one_query():
+    flights = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def read():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return calls
+
+    readers = [
+        asyncio.create_task(flights.do("user", "page", 1, read)) for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*readers) == [1] * 5
+    assert calls == 1
+
+
+async def test_the_error_of_a_read_reaches_every_caller():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def read():
+        await release.wait()
+        raise ValueError("failed")
+
+    readers = [
+        asyncio.create_task(flights.do("user", "page", 1, read)) for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*readers, return_exceptions=True)
+
+    assert [str(result) for result in results] == ["failed"] * 3
+
+
+async def test_a_write_stops_later_reads_from_joining_the_flight():
+    release = asyncio.Event()
+    calls = 0
+
+    async def read():
+        nonlocal calls
+        calls += 1
+        call = calls
+        await release.wait()
+        return call
+
+    first = asyncio.create_task(task_read_flights.do("user", "page", 1, read))
+    await asyncio.sleep(0)
+    await tasks_service.mark_tasks_changed("user")
+    second = asyncio.create_task(task_read_flights.do("user", "page", 1, read))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(first, second) == [1, 2]
+
+
+async def test_concurrent_task_listings_read_the_database_once(
+    client, no_task_cache, monkeypatch
+):
+    monkeypatch.setattr(load_shedding, "USER_MAX_IN_FLIGHT", 0)
+    headers = await sign_up(client)
+    await create_task(client, headers)
+    load_task_page = tasks_service._load_task_page
+    loads = 0
+
+    async def counting_load_task_page(**kwargs):
+        nonlocal loads
+        loads += 1
+        # Keeps the read in flight until every request has joined it
+        await asyncio.sleep(0.1)
+        return await load_task_page(**kwargs)
+
+    monkeypatch.setattr(tasks_service, "_load_task_page", counting_load_task_page)
+
+    responses = await asyncio.gather(
+        *(client.get("/tasks/", headers=headers) for _ in range(10))
+    )
+
+    assert [response.status_code for response in responses] == [200] * 10
+    assert len({response.text for response in responses}) == 1
+    assert loads == 1
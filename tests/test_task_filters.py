@@ -0,0 +1,91 @@
+import datetime
+
+import pytest
+from sqlalchemy import text
+
+from app import dependencies
+from app.schema_upgrade import upgrade_schema
+from tests.conftest import sign_up
+
+pytestmark = pytest.mark.anyio
+
+TODAY = datetime.date.today()
+YESTERDAY = TODAY - datetime.timedelta(days=1)
+TOMORROW = TODAY + datetime.timedelta(days=1)
+
+
+@pytest.fixture
+async def headers(client):
+    headers = await sign_up(client)
+    tasks = [
+        ("Pay rent", "Transfer to the landlord", YESTERDAY),
+        ("Buy groceries", "Milk, eggs and bread", TODAY),
+        ("Book flights", "Holiday in Lisbon", TOMORROW),
+    ]
+    response = await client.post(
+        "/tasks/bulk",
+        json=[
+            {"title": title, "description": description, "due_date": str(due_date)}
+            for title, description, due_date in tasks
+        ],
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    return headers
+
+
+async def list_titles(client, headers, **params) -> list:
+    response = await client.get("/tasks/", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return [task["title"] for task in response.json()["items"]]
+
+
+@pytest.mark.parametrize(
+    "params, titles",
+    [
+        ({}, ["Pay rent", "Buy groceries", "Book flights"]),
+        ({"due_from": TODAY}, ["Buy groceries", "Book flights"]),
+        ({"due_to": TODAY}, ["Pay rent", "Buy groceries"]),
+        ({"due_from": TODAY, "due_to": TODAY}, ["Buy groceries"]),
+        ({"due_from": TOMORROW, "due_to": YESTERDAY}, []),
+        ({"overdue": True}, ["Pay rent"]),
+        ({"created_from": TODAY}, ["Pay rent", "Buy groceries", "Book flights"]),
+        ({"created_to": YESTERDAY}, []),
+        ({"created_from": TOMORROW, "created_to": YESTERDAY}, []),
+        ({"q": "groceries"}, ["Buy groceries"]),
+        ({"q": "lisbon"}, ["Book flights"]),
+        ({"q": "pay landlord"}, ["Pay rent"]),
+        ({"q": "pay lisbon"}, []),
+        ({"q": 'milk OR "lisbon'}, []),
+        ({"q": "book", "due_to": TODAY}, []),
+    ],
+)
+async def test_task_filters(client, headers, params, titles):
+    assert await list_titles(client, headers, **params) == titles
+
+
+async def test_search_follows_task_updates_and_deletes(client, headers):
+    [task] = (
+        await client.get("/tasks/", params={"q": "rent"}, headers=headers)
+    ).json()["items"]
+
+    await client.patch(
+        f"/tasks/{task['id']}", json={"title": "Pay water bill"}, headers=headers
+    )
+    assert await list_titles(client, headers, q="rent") == []
+    assert await list_titles(client, headers, q="water") == ["Pay water bill"]
+
+    await client.delete(f"/tasks/{task['id']}", headers=headers)
+    assert await list_titles(client, headers, q="water") == []
+
+
+async def test_upgrade_rebuilds_the_search_index(client, headers, no_task_cache):
+    async with dependencies.engine.begin() as connection:
+        await connection.execute(
+            text("INSERT INTO tasks_fts(tasks_fts) VALUES ('delete-all')")
+        )
+    assert await list_titles(client, headers, q="groceries") == []
+
+    await upgrade_schema(dependencies.engine)
+
+    assert await list_titles(client, headers, q="groceries") == ["Buy groceries"]
@@ -0,0 +1,81 @@
+import datetime
+import uuid
+
+import pytest
+
+from app import dependencies
+from app.crud import tasks_crud
+from tests.conftest import sign_up
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_tasks_due(client, headers, *due_dates: datetime.date) -> str:
+    response = await client.post(
+        "/tasks/bulk",
+        json=[
+            {"title": "Task", "description": "", "due_date": str(due_date)}
+            for due_date in due_dates
+        ],
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["results"][0]["task"]["created_by"]
+
+
+async def test_stats_count_the_tasks_by_due_date(client):
+    headers = await sign_up(client)
+    today = datetime.date.today()
+    next_monday = today + datetime.timedelta(days=7 - today.weekday())
+    await create_tasks_due(
+        client,
+        headers,
+        today - datetime.timedelta(days=1),
+        today,
+        today,
+        next_monday,
+    )
+
+    response = await client.get("/tasks/stats", headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "total": 4,
+        "overdue": 1,
+        "due_today": 2,
+        "due_this_week": 2,
+    }
+
+
+@pytest.mark.parametrize(
+    "today, counts",
+    [
+        # Wednesday: the week runs until Sunday the 6th
+        (datetime.date(2030, 1, 2), (0, 1, 3)),
+        # Saturday: only the weekend is left
+        (datetime.date(2030, 1, 5), (2, 0, 1)),
+        # Sunday: the week ends today
+        (datetime.date(2030, 1, 6), (2, 1, 1)),
+        # Monday: a new week, up to Sunday the 13th
+        (datetime.date(2030, 1, 7), (3, 1, 1)),
+    ],
+)
+async def test_the_week_ends_on_sunday(client, today, counts):
+    headers = await sign_up(client)
+    # Wednesday, Friday, Sunday and the next Monday
+    user_id = await create_tasks_due(
+        client,
+        headers,
+        datetime.date(2030, 1, 2),
+        datetime.date(2030, 1, 4),
+        datetime.date(2030, 1, 6),
+        datetime.date(2030, 1, 7),
+    )
+
+    async with dependencies.SessionLocal() as db:
+        stats = await tasks_crud.get_task_stats(
+            db=db, user_id=uuid.UUID(user_id), today=today
+        )
+
+    assert (stats.overdue, stats.due_today, stats.due_this_week) == counts
+    assert stats.total == 4
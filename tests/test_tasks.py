@@ -0,0 +1,96 @@
+import uuid
+
+import pytest
+
+import app.services.tasks_service as tasks_service
+from tests.conftest import create_task, sign_up
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_patch_keeps_the_fields_left_out(client):
+    headers = await sign_up(client)
+    task = await create_task(client, headers)
+
+    response = await client.patch(
+        f"/tasks/{task['id']}", json={"title": "Patched"}, headers=headers
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {**task, "title": "Patched"}
+
+
+async def test_patch_clears_the_description_when_null(client):
+    headers = await sign_up(client)
+    task = await create_task(client, headers)
+
+    response = await client.patch(
+        f"/tasks/{task['id']}", json={"description": None}, headers=headers
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {**task, "description": None}
+
+
+@pytest.mark.parametrize("field", ["title", "due_date"])
+async def test_patch_rejects_null_for_required_fields(client, field):
+    headers = await sign_up(client)
+    task = await create_task(client, headers)
+
+    response = await client.patch(
+        f"/tasks/{task['id']}", json={field: None}, headers=headers
+    )
+
+    assert response.status_code == 422
+
+
+async def test_bulk_writes_matching_no_task_leave_the_tasks_unchanged(
+    client, monkeypatch
+):
+    headers = await sign_up(client)
+    await create_task(client, headers)
+    changed = []
+
+    async def mark_tasks_changed(user_id):
+        changed.append(user_id)
+
+    monkeypatch.setattr(tasks_service, "mark_tasks_changed", mark_tasks_changed)
+    missing_id = str(uuid.uuid4())
+
+    responses = [
+        await client.put(
+            "/tasks/bulk",
+            json=[
+                {
+                    "id": missing_id,
+                    "title": "Missing",
+                    "description": "",
+                    "due_date": "2030-01-01",
+                }
+            ],
+            headers=headers,
+        ),
+        await client.request(
+            "DELETE", "/tasks/bulk", json=[missing_id], headers=headers
+        ),
+    ]
+
+    assert [response.status_code for response in responses] == [200, 200]
+    assert changed == []
+
+
+async def test_bulk_put_applies_items_changing_different_fields(client):
+    headers = await sign_up(client)
+    first = await create_task(client, headers, title="First")
+    second = await create_task(client, headers, title="Second")
+    changes = [
+        {**first, "title": "First renamed"},
+        {**second, "due_date": "2031-06-30"},
+    ]
+
+    response = await client.put("/tasks/bulk", json=changes, headers=headers)
+    tasks = (await client.get("/tasks/", headers=headers)).json()["items"]
+
+    assert response.status_code == 200, response.text
+    assert [result["task"] for result in response.json()["results"]] == changes
+    assert sorted(tasks, key=lambda task: task["title"]) == changes
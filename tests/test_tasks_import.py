@@ -0,0 +1,46 @@
+import pytest
+
+from tests.conftest import create_task, sign_up
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_import_inserts_valid_rows_and_reports_rejected_ones(client):
+    headers = await sign_up(client)
+    csv = (
+        "title,description,due_date\n"
+        "First,One,2030-01-01\n"
+        "Invalid,Bad due date,tomorrow\n"
+        "Second,Two,2030-01-02\n"
+    )
+
+    response = await client.post(
+        "/tasks/import",
+        files={"file": ("tasks.csv", csv.encode(), "text/csv")},
+        headers=headers,
+    )
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["imported"], result["failed"]) == (2, 1)
+    assert result["errors"][0]["line"] == 3
+
+
+async def test_imported_tasks_get_the_same_created_date_as_created_ones(client):
+    headers = await sign_up(client)
+    created = await create_task(client, headers)
+    response = await client.post(
+        "/tasks/import",
+        files={
+            "file": (
+                "tasks.ndjson",
+                b'{"title": "Imported", "description": "", "due_date": "2030-01-01"}\n',
+            )
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+
+    tasks = (await client.get("/tasks/", headers=headers)).json()["items"]
+
+    assert {task["created_date"] for task in tasks} == {created["created_date"]}
@@ -0,0 +1,114 @@
+from contextlib import nullcontext
+import asyncio
+import uuid
+
+import pytest
+
+from app.crud import tasks_crud
+from app.schemas import task_schema
+from app.services.write_batcher import WriteBatcher, write_batcher
+from app.utils import load_shedding
+from tests.conftest import sign_up
+
+pytestmark = pytest.mark.anyio
+
+
+def new_task(title: str) -> task_schema.TaskBase:
+    return task_schema.TaskBase(title=title, description="", due_date="2030-01-01")
+
+
+@pytest.fixture
+def applied_batches(monkeypatch):
+    """
+    Replaces `tasks_crud.apply_task_writes` with a fake recording the titles of
+    every batch, which fails the batches creating a task titled "Bad".
+    """
+    batches = []
+
+    async def apply_task_writes(db, creates, deletes):
+        titles = [task.title for task, _ in creates]
+        batches.append(titles)
+        if "Bad" in titles:
+            raise ValueError("Bad task")
+        return titles, {task_id for task_id, _ in deletes}
+
+    monkeypatch.setattr(tasks_crud, "apply_task_writes", apply_task_writes)
+    return batches
+
+
+async def test_concurrent_writes_are_applied_in_one_batch(applied_batches):
+    batcher = WriteBatcher(nullcontext, max_size=10, max_wait=0.01)
+    task_id = uuid.uuid4()
+
+    results = await asyncio.gather(
+        batcher.create(new_task("First"), uuid.uuid4()),
+        batcher.create(new_task("Second"), uuid.uuid4()),
+        batcher.delete(task_id, uuid.uuid4()),
+    )
+
+    assert results == ["First", "Second", True]
+    assert applied_batches == [["First", "Second"]]
+
+
+async def test_a_full_batch_is_applied_without_waiting(applied_batches):
+    batcher = WriteBatcher(nullcontext, max_size=2, max_wait=60)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            *(batcher.create(new_task(str(i)), uuid.uuid4()) for i in range(4))
+        ),
+        timeout=1,
+    )
+
+    assert results == ["0", "1", "2", "3"]
+    assert applied_batches == [["0", "1"], ["2", "3"]]
+
+
+async def test_a_failed_batch_is_retried_one_write_at_a_time(applied_batches):
+    batcher = WriteBatcher(nullcontext, max_size=10, max_wait=0.01)
+
+    results = await asyncio.gather(
+        batcher.create(new_task("First"), uuid.uuid4()),
+        batcher.create(new_task("Bad"), uuid.uuid4()),
+        batcher.create(new_task("Third"), uuid.uuid4()),
+        return_exceptions=True,
+    )
+
+    assert results[0] == "First" and results[2] == "Third"
+    assert isinstance(results[1], ValueError)
+    assert applied_batches == [["First", "Bad", "Third"], ["First"], ["Bad"], ["Third"]]
+
+
+async def test_batched_task_creates_commit_together(client, monkeypatch):
+    monkeypatch.setattr(load_shedding, "USER_MAX_IN_FLIGHT", 0)
+    monkeypatch.setattr(write_batcher, "enabled", True)
+    monkeypatch.setattr(write_batcher, "max_wait", 0.05)
+    headers = await sign_up(client)
+    apply_task_writes = tasks_crud.apply_task_writes
+    batches = []
+
+    async def recording_apply_task_writes(db, creates, deletes):
+        batches.append(len(creates))
+        return await apply_task_writes(db=db, creates=creates, deletes=deletes)
+
+    monkeypatch.setattr(tasks_crud, "apply_task_writes", recording_apply_task_writes)
+
+    responses = await asyncio.gather(
+        *(
+            client.post(
+                "/tasks/",
+                json={
+                    "title": f"Task {i}",
+                    "description": "",
+                    "due_date": "2030-01-01",
+                },
+                headers=headers,
+            )
+            for i in range(5)
+        )
+    )
+    tasks = (await client.get("/tasks/", headers=headers)).json()["items"]
+
+    assert [response.status_code for response in responses] == [200] * 5
+    assert batches == [5]
+    assert sorted(task["title"] for task in tasks) == [f"Task {i}" for i in range(5)]